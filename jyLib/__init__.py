@@ -1,7 +1,17 @@
-from . import common
-from . import commonui
-from . import curves
-from .reloadmodules import refresh
+from . import geometry
+from . import thumbnails
 
-from . import rigger
-from . import tools
+try:
+    import maya.cmds
+except ImportError:
+    # Outside of Maya only the modules that do not depend on Maya are available
+    pass
+else:
+    from . import common
+    from . import benchmarks
+    from . import commonui
+    from . import curves
+    from .reloadmodules import refresh
+
+    from . import rigger
+    from . import tools
@@ -0,0 +1,207 @@
+"""This module contains a driver that runs a build script over many scenes in parallel.
+
+Nothing in this module depends on Maya. Each job opens one scene in its own interpreter
+process (mayapy by default), runs the build script and optionally saves the scene. Any other
+Python interpreter can stand in for mayapy, in which case the scene is not opened and the
+build script only receives its path.
+
+The build script is run with the following globals:
+    SCENE: path of the scene the job is building
+
+The driver only needs the standard library and is run as a script with a plain Python
+interpreter. It is not imported by the jyLib package. Running it with -m or from mayapy
+imports the package instead, which needs numpy and, under mayapy, starts a Maya session in
+the driver process on top of the one in each job.
+
+Example:
+    python jyLib/batch.py build_limbs.py char_a.ma char_b.ma --workers 4 --timeout 600
+"""
+import argparse
+import json
+import multiprocessing
+import multiprocessing.pool
+import subprocess
+import sys
+import tempfile
+import time
+
+# Interpreter that runs the jobs
+INTERPRETER = 'mayapy'
+# Seconds between checks of a running job
+POLLINTERVAL = 0.1
+# Number of lines of output kept in the report for failed jobs
+OUTPUTLINES = 20
+
+# Code run by each job's interpreter with the arguments: scene, build script, save (0 or 1)
+_BOOTSTRAP = '''
+import sys
+uScene, uScript, uSave = sys.argv[1:4]
+try:
+    import maya.standalone
+except ImportError:
+    # Stand-in interpreter without Maya
+    cmds = None
+else:
+    maya.standalone.initialize()
+    import maya.cmds as cmds
+    cmds.file(uScene, o=True, f=True)
+with open(uScript) as fileScript:
+    codeScript = compile(fileScript.read(), uScript, 'exec')
+exec(codeScript, {'__name__': '__main__', '__file__': uScript, 'SCENE': uScene})
+if cmds is not None:
+    if uSave == '1':
+        cmds.file(save=True, f=True)
+    maya.standalone.uninitialize()
+'''
+
+
+def _runJob(uScene, uScript, bSave, fTimeout, uInterpreter):
+    """Runs the build script on one scene in a new interpreter process.
+
+    Args:
+        uScene (str): path of the scene
+        uScript (str): path of the build script
+        bSave (bool): whether the scene is saved after the build
+        fTimeout (float): seconds before the process is killed, or None for no limit
+        uInterpreter (str): interpreter that runs the job
+    Returns:
+        dict: returncode, timedOut, output and seconds of the run
+    """
+    lCommand = [uInterpreter, '-c', _BOOTSTRAP, uScene, uScript, '1' if bSave else '0']
+    # Output goes to a file so that a chatty job can never fill a pipe and block
+    with tempfile.TemporaryFile() as fileOutput:
+        fStart = time.time()
+        process = subprocess.Popen(lCommand, stdout=fileOutput, stderr=subprocess.STDOUT)
+        bTimedOut = False
+        while process.poll() is None:
+            if fTimeout is not None and time.time() - fStart > fTimeout:
+                process.kill()
+                process.wait()
+                bTimedOut = True
+                break
+            time.sleep(POLLINTERVAL)
+        fSeconds = time.time() - fStart
+        fileOutput.seek(0)
+        uOutput = fileOutput.read().decode('utf-8', 'replace')
+    return {
+        'returncode': process.returncode,
+        'timedOut': bTimedOut,
+        'output': uOutput,
+        'seconds': fSeconds,
+    }
+
+
+def _runJobWithRetries(tJob):
+    """Runs a job until it succeeds or runs out of retries.
+
+    Args:
+        tJob (tuple): scene, build script, save, timeout, retries and interpreter
+    Returns:
+        dict: the report of the job
+    """
+    uScene, uScript, bSave, fTimeout, iRetries, uInterpreter = tJob
+    lAttemptSeconds = []
+    for _ in range(iRetries + 1):
+        dictRun = _runJob(uScene, uScript, bSave, fTimeout, uInterpreter)
+        lAttemptSeconds.append(dictRun['seconds'])
+        if dictRun['returncode'] == 0 and not dictRun['timedOut']:
+            break
+    bSuccess = dictRun['returncode'] == 0 and not dictRun['timedOut']
+    if bSuccess:
+        uError = None
+    elif dictRun['timedOut']:
+        uError = 'Timed out after {} seconds.'.format(fTimeout)
+    else:
+        uError = '\n'.join(dictRun['output'].strip().splitlines()[-OUTPUTLINES:])
+    return {
+        'scene': uScene,
+        'success': bSuccess,
+        'returncode': dictRun['returncode'],
+        'attempts': len(lAttemptSeconds),
+        'seconds': dictRun['seconds'],
+        'totalSeconds': sum(lAttemptSeconds),
+        'error': uError,
+    }
+
+
+def runBatch(lScenes, uScript, iWorkers=None, fTimeout=None, iRetries=0, bSave=False,
+             uInterpreter=None, uReportPath=None):
+    """Runs the build script over every scene, several scenes at a time.
+
+    Args:
+        lScenes (list of str): paths of the scenes
+        uScript (str): path of the build script
+        iWorkers (int, optional): number of jobs that run at the same time. Defaults to the
+            number of cores
+        fTimeout (float, optional): seconds before a job is killed. Defaults to no limit
+        iRetries (int, optional): number of times a failed job is run again
+        bSave (bool, optional): whether each scene is saved after a successful build
+        uInterpreter (str, optional): interpreter that runs the jobs. Defaults to INTERPRETER
+        uReportPath (str, optional): path of a JSON file the report is written to
+    Returns:
+        dict: report with the per-scene results under 'jobs' in the order of lScenes
+    """
+    iWorkers = iWorkers or multiprocessing.cpu_count()
+    uInterpreter = uInterpreter or INTERPRETER
+    lJobs = [(uScene, uScript, bSave, fTimeout, iRetries, uInterpreter) for uScene in lScenes]
+    fStart = time.time()
+    # The jobs are separate processes, so threads are enough to supervise them
+    pool = multiprocessing.pool.ThreadPool(max(1, min(iWorkers, len(lJobs))))
+    try:
+        lResults = pool.map(_runJobWithRetries, lJobs, chunksize=1)
+    finally:
+        pool.close()
+        pool.join()
+    dictReport = {
+        'script': uScript,
+        'workers': iWorkers,
+        'seconds': time.time() - fStart,
+        'succeeded': sum(1 for x in lResults if x['success']),
+        'failed': sum(1 for x in lResults if not x['success']),
+        'jobs': lResults,
+    }
+    if uReportPath:
+        with open(uReportPath, 'w') as fileReport:
+            json.dump(dictReport, fileReport, indent=4, sort_keys=True)
+    return dictReport
+
+
+def formatReport(dictReport):
+    """Formats a batch report as text.
+
+    Args:
+        dictReport (dict): report returned by runBatch
+    Returns:
+        str: the formatted report
+    """
+    lLines = ['{} succeeded, {} failed in {:.1f}s with {} workers'.format(
+        dictReport['succeeded'], dictReport['failed'], dictReport['seconds'],
+        dictReport['workers'])]
+    for dictJob in dictReport['jobs']:
+        lLines.append('{:<6} {:>8.1f}s  {} attempt(s)  {}'.format(
+            'OK' if dictJob['success'] else 'FAILED', dictJob['totalSeconds'],
+            dictJob['attempts'], dictJob['scene']))
+        if dictJob['error']:
+            lLines.extend('    ' + x for x in dictJob['error'].splitlines())
+    return '\n'.join(lLines)
+
+
+def main(lArgs=None):
+    parser = argparse.ArgumentParser(description='Runs a build script over many scenes in parallel.')
+    parser.add_argument('script', help='path of the build script')
+    parser.add_argument('scenes', nargs='+', help='paths of the scenes')
+    parser.add_argument('--workers', type=int, help='number of jobs that run at the same time')
+    parser.add_argument('--timeout', type=float, help='seconds before a job is killed')
+    parser.add_argument('--retries', type=int, default=0, help='number of times a failed job is run again')
+    parser.add_argument('--save', action='store_true', help='save each scene after the build')
+    parser.add_argument('--interpreter', help='interpreter that runs the jobs')
+    parser.add_argument('--report', help='path of a JSON file the report is written to')
+    args = parser.parse_args(lArgs)
+    dictReport = runBatch(args.scenes, args.script, args.workers, args.timeout, args.retries,
+                          args.save, args.interpreter, args.report)
+    print(formatReport(dictReport))
+    return 0 if dictReport['failed'] == 0 else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
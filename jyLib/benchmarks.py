@@ -0,0 +1,86 @@
+"""This module contains benchmarks that compare the PyNode and string code paths of common."""
+import timeit
+import maya.cmds as cmds
+import pymel.core as pm
+from . import common
+
+
+def _createChain(iLength, uPrefix):
+    """Creates a chain of joints, each with a control parented under an offset transform.
+
+    Args:
+        iLength (int): number of joints in the chain
+        uPrefix (str): side used in the names of the joints and controls
+    Returns:
+        list, list: list of joint long names, list of control long names
+    """
+    cmds.select(cl=True)
+    lJoints = []
+    lCtrls = []
+    for i in xrange(iLength):
+        uJoint = cmds.joint(n='Jnt_{}_Bench{}'.format(uPrefix, i), p=(i, 0, 0))
+        lJoints.append(cmds.ls(uJoint, long=True)[0])
+    for i in xrange(iLength):
+        uOffset = cmds.createNode('transform', n='Xform_{}_Bench{}Ctrl'.format(uPrefix, i))
+        uCtrl = cmds.circle(n='Ctrl_{}_Bench{}'.format(uPrefix, i), ch=False)[0]
+        lCtrls.append(cmds.ls(cmds.parent(uCtrl, uOffset)[0], long=True)[0])
+    return lJoints, lCtrls
+
+
+def _time(func, iRepeat):
+    """Returns the best time in seconds of running the function iRepeat times."""
+    return min(timeit.repeat(func, number=iRepeat, repeat=3))
+
+
+def compareCommonPaths(iLength=100, iRepeat=10):
+    """Times the common functions when given PyNodes and when given strings.
+
+    A temporary joint chain and set of controls are created in the current scene and deleted
+    afterwards. The results are printed as a table and returned.
+
+    Args:
+        iLength (int, optional): number of joints and controls to create
+        iRepeat (int, optional): number of times each function is run
+    Returns:
+        dict: function name to a tuple of (PyNode seconds, string seconds)
+    """
+    lJoints, lCtrls = _createChain(iLength, 'L')
+    lRoots = [lJoints[0]] + [cmds.listRelatives(x, p=True, f=True)[0] for x in lCtrls]
+    lPyJoints = [pm.PyNode(x) for x in lJoints]
+    lPyCtrls = [pm.PyNode(x) for x in lCtrls]
+
+    dictResult = {}
+    try:
+        dictResult['_getListOfObjectNames'] = (
+            _time(lambda: common._getListOfObjectNames(lPyJoints), iRepeat),
+            _time(lambda: common._getListOfObjectNames(lJoints), iRepeat))
+        dictResult['getHierarchy'] = (
+            _time(lambda: common.getHierarchy(lPyJoints[0], lPyJoints[-1]), iRepeat),
+            _time(lambda: common.getHierarchy(lJoints[0], lJoints[-1]), iRepeat))
+        dictResult['checkContinuousHierarchy'] = (
+            _time(lambda: common.checkContinuousHierarchy(lPyJoints[::2]), iRepeat),
+            _time(lambda: common.checkContinuousHierarchy(lJoints[::2]), iRepeat))
+        dictResult['hasOffsetXform'] = (
+            _time(lambda: [common.hasOffsetXform(x) for x in lPyCtrls], iRepeat),
+            _time(lambda: [common.hasOffsetXform(x) for x in lCtrls], iRepeat))
+        # Offset transforms can only be created once per control, so each path gets its own
+        # set of controls
+        lPyOffsetCtrls = [pm.PyNode(cmds.circle(n='Ctrl_R_Bench{}'.format(i), ch=False)[0])
+                          for i in xrange(iLength)]
+        lOffsetCtrls = [cmds.circle(n='Ctrl_C_Bench{}'.format(i), ch=False)[0]
+                        for i in xrange(iLength)]
+        lRoots.extend([x.longName() for x in lPyOffsetCtrls])
+        lRoots.extend(cmds.ls(lOffsetCtrls, long=True))
+        dictResult['createOffsetXform'] = (
+            timeit.timeit(lambda: lRoots.extend(
+                [common.createOffsetXform(x).longName() for x in lPyOffsetCtrls]), number=1),
+            timeit.timeit(lambda: lRoots.extend(
+                [common.createOffsetXform(x) for x in lOffsetCtrls]), number=1))
+    finally:
+        cmds.delete([x for x in lRoots if cmds.objExists(x)])
+
+    print('{:<28}{:>12}{:>12}{:>10}'.format('Function', 'PyNode', 'String', 'Speedup'))
+    for uName, (fPyNode, fString) in sorted(dictResult.iteritems()):
+        print('{:<28}{:>12.5f}{:>12.5f}{:>9.1f}x'.format(uName, fPyNode, fString,
+                                                       fPyNode / fString if fString else 0))
+    return dictResult
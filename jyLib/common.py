@@ -1,7 +1,95 @@
+import collections
+import functools
+import time
 import maya.cmds as cmds
 import maya.mel as mel
 import pymel.core as pm
 import pymel.core.datatypes as dt
+from . import geometry
+
+# Durations of the most recent bulk operations as (name, seconds) tuples
+BULKTIMINGS = collections.deque(maxlen=100)
+
+
+class BulkOperation(object):
+    """Context that jyLib's bulk scene edits run inside.
+
+    Everything done inside the context is grouped into a single named undo chunk and the
+    viewport refresh is suspended until the outermost context exits. For scripted batch
+    builds the undo queue can be turned off entirely instead. The previous state is always
+    restored, even if an exception is raised. The duration of each context is kept in
+    fDuration and the duration of the outermost context is recorded in BULKTIMINGS.
+
+    Can also be used as a decorator, in which case each call runs inside a new context:
+
+        @BulkOperation('Reset Side')
+        def resetSide(...):
+
+    Args:
+        uName (str): name of the undo chunk and timing entry
+        bSuspendRefresh (bool, optional): whether the viewport refresh is suspended
+        bUndo (bool, optional): whether the edits are recorded into the undo queue
+    """
+    # Number of active contexts that suspended the refresh
+    _iRefreshDepth = 0
+    # Number of active contexts, only the outermost one is recorded in BULKTIMINGS
+    _iDepth = 0
+
+    def __init__(self, uName, bSuspendRefresh=True, bUndo=True):
+        self.uName = uName
+        self.bSuspendRefresh = bSuspendRefresh
+        self.bUndo = bUndo
+        self.fDuration = None
+        self._fStart = None
+        self._bUndoState = None
+
+    def __enter__(self):
+        self._fStart = time.time()
+        if self.bUndo:
+            cmds.undoInfo(openChunk=True, chunkName=self.uName)
+        else:
+            self._bUndoState = cmds.undoInfo(q=True, state=True)
+        try:
+            if not self.bUndo:
+                cmds.undoInfo(stateWithoutFlush=False)
+            if self.bSuspendRefresh:
+                if BulkOperation._iRefreshDepth == 0:
+                    cmds.refresh(suspend=True)
+                BulkOperation._iRefreshDepth += 1
+        except Exception:
+            # Do not leave the undo chunk open or the undo queue off
+            self._restoreUndo()
+            raise
+        BulkOperation._iDepth += 1
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        try:
+            if self.bSuspendRefresh:
+                BulkOperation._iRefreshDepth -= 1
+                if BulkOperation._iRefreshDepth == 0:
+                    cmds.refresh(suspend=False)
+        finally:
+            self._restoreUndo()
+            BulkOperation._iDepth -= 1
+            self.fDuration = time.time() - self._fStart
+            if BulkOperation._iDepth == 0:
+                BULKTIMINGS.append((self.uName, self.fDuration))
+        return False
+
+    def _restoreUndo(self):
+        """Closes the undo chunk or turns the undo queue back to its previous state."""
+        if self.bUndo:
+            cmds.undoInfo(closeChunk=True)
+        else:
+            cmds.undoInfo(stateWithoutFlush=self._bUndoState)
+
+    def __call__(self, func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with BulkOperation(self.uName, self.bSuspendRefresh, self.bUndo):
+                return func(*args, **kwargs)
+        return wrapper
 
 
 def getNamespace(uName):
@@ -33,6 +121,7 @@ def getObjectName(uName):
         return uName
 
 
+@BulkOperation('Reposition')
 def reposition(oParent, oChild, uType='parent'):
     """Repositions the transforms based on the type of constraint provided.
 
@@ -62,7 +151,7 @@ def _getListOfObjectNames(oObj):
 
     Converts a single PyMel object or list of PyMel objects into
     a list of the objects' long names. Converts a string that refers to
-    an object to a list containing that string.
+    an object to a list containing that string. Strings in a list are kept as they are.
 
     Args:
         oObj (xform or list of xforms): given object
@@ -70,27 +159,59 @@ def _getListOfObjectNames(oObj):
         list: list of names of the objects
     """
     if isinstance(oObj, basestring):
-        lObj = [oObj]
+        return [oObj]
     elif isinstance(oObj, pm.nodetypes.DagNode):
         lObj = [oObj]
     else:
         lObj = oObj
     try:
-        lObj = [x.longName() for x in lObj]
+        lObj = [x if isinstance(x, basestring) else x.longName() for x in lObj]
     except AttributeError:
         pass
     return lObj
 
 
+def _getLongName(uNode):
+    """Gets the long name of the node from its name using maya.cmds."""
+    return cmds.ls(uNode, long=True)[0]
+
+
+def _getParent(uNode):
+    """Gets the long name of the parent of the node using maya.cmds.
+
+    Args:
+        uNode (str): name of the node
+    Returns:
+        str: long name of the parent or None if the node is parented to the world
+    """
+    lParent = cmds.listRelatives(uNode, p=True, f=True)
+    if lParent:
+        return lParent[0]
+    return None
+
+
 def getHierarchy(xStart, xEnd):
     """Returns a list that contains the hierarchy of nodes from the start node to the end node.
 
+    If both nodes are given as strings, the hierarchy is found with maya.cmds and returned
+    as a list of long names.
+
     Args:
-        xStart (node): start node
-        xEnd (node): end node
+        xStart (node or str): start node
+        xEnd (node or str): end node
     Returns:
         list: ordered hierarchy of nodes from the start node to the end node
     """
+    if isinstance(xStart, basestring) and isinstance(xEnd, basestring):
+        uStart = _getLongName(xStart)
+        uEnd = _getLongName(xEnd)
+        # Check if both nodes are hierarchically connected
+        if uEnd not in (cmds.listRelatives(uStart, ad=True, f=True) or []):
+            cmds.error('There is no hierarchical connection from {} to {}.'.format(xStart, xEnd))
+        lNodes = [uEnd]
+        while lNodes[0] != uStart:
+            lNodes.insert(0, _getParent(lNodes[0]))
+        return lNodes
     # Check if both nodes are hierarchically connected
     if all([node != xEnd for node in pm.listRelatives(xStart, ad=True)]):
         pm.error('There is no hierarchical connection from {} to {}.'.format(xStart, xEnd))
@@ -113,6 +234,16 @@ def parentShapes(lShapes, xParent):
         lShapes (list of shapes): a list containing all the shapes to add
         xformParent (transform): the transform that the shapes will be parented under
     """
+    if isinstance(xParent, basestring):
+        for uShape in _getListOfObjectNames(lShapes):
+            # Same steps as below with maya.cmds
+            uShape = cmds.parent(uShape, xParent, s=True, a=True)[0]
+            uAdded = _getParent(uShape)
+            cmds.makeIdentity(uAdded, a=True, t=True, r=True, s=True, n=0, pn=True)
+            uAdded = cmds.parent(uAdded, w=True)[0]
+            cmds.parent('{}|{}'.format(uAdded, uShape.rsplit('|', 1)[-1]), xParent, s=True, r=True)
+            cmds.delete(uAdded)
+        return
     for shapeNode in lShapes:
         # Reparent the shape node under the new parent with the absolute flag
         pm.parent(shapeNode, xParent, s=True, a=True)
@@ -135,9 +266,24 @@ def checkContinuousHierarchy(lJoints):
     should be at the top of the hierarchy. If any joint or transform is found in the hierarchy but
     not in the list, it will be added to the list.
 
+    If the joints are given as strings, the check is done with maya.cmds and a list of long
+    names is returned.
+
     Keyword arguments:
     lJoints -- list of joints or transforms in a hierarchy with the first item being the top
     """
+    if lJoints and isinstance(lJoints[0], basestring):
+        lJoints = cmds.ls(lJoints, long=True)
+        i = 1
+        while i < len(lJoints):
+            uParent = _getParent(lJoints[i])
+            if uParent not in lJoints:
+                cmds.warning(('{} does not influence the mesh, but a child of it does. '
+                              'Adding it to the selection').format(uParent))
+                lJoints.insert(i, uParent)
+            else:
+                i += 1
+        return lJoints
     i = 1
     while i < len(lJoints):
         if not lJoints[i].getParent() in lJoints:
@@ -149,14 +295,14 @@ def checkContinuousHierarchy(lJoints):
     return lJoints
 
 
-def midpoint((x1, y1, z1), (x2, y2, z2)):
+def midpoint(lPoint1, lPoint2):
     """Gets the midpoint of two points."""
-    return ((x1+x2)/2, (y1+y2)/2, (z1+z2)/2)
+    return tuple(geometry.midpoints(lPoint1, lPoint2)[0].tolist())
 
 
 def isclose(a, b, rel_tol=1e-09, abs_tol=0.00001):
     """Determines if two points are close based on a tolerance."""
-    return abs(a - b) <= max(rel_tol * max(abs(a), abs(b)), abs_tol)
+    return bool(geometry.isclose(a, b, rel_tol, abs_tol))
 
 
 def getVariable(uVariable):
@@ -168,24 +314,42 @@ def calculateClosestPointOnPlane(vecPlane1, vecPlane2, vecPlane3, vecPoint):
     """Calculates the closest point on a plane defined by 3 points from a provided point.
 
     Args:
-        vecPlane1 (dt.Vector): point1 on plane
-        vecPlane2 (dt.Vector): point2 on plane
-        vecPlane3 (dt.Vector): point3 on plane
-        vecPoint (dt.Vector): point to find the closest point from
+        vecPlane1 (dt.Vector or triple): point1 on plane
+        vecPlane2 (dt.Vector or triple): point2 on plane
+        vecPlane3 (dt.Vector or triple): point3 on plane
+        vecPoint (dt.Vector or triple): point to find the closest point from
     Returns:
-        dt.Vector: point on the plane closest to vecPoint
+        dt.Vector or tuple: point on the plane closest to vecPoint. A tuple is returned if
+            vecPoint is not a dt.Vector
     """
-    vecPlaneNormal = ((vecPlane2 - vecPlane1).cross(vecPlane3 - vecPlane1)).normal()
-    distance = vecPlaneNormal.dot(vecPoint - vecPlane1)
-    return vecPoint + -distance * vecPlaneNormal
+    tResult = tuple(geometry.closestPointsOnPlanes(vecPlane1, vecPlane2, vecPlane3,
+                                                   vecPoint)[0].tolist())
+    if isinstance(vecPoint, dt.Vector):
+        return dt.Vector(*tResult)
+    return tResult
 
 
 def renameUnitConversion(attrDest):
     """Renames the connected Unit Conversion node based on the input attribute.
 
     Args:
-        attrDest (Attribute): attribute that the unit conversion node is connected to
+        attrDest (Attribute or str): attribute that the unit conversion node is connected to
     """
+    if isinstance(attrDest, basestring):
+        # Same steps as below with maya.cmds
+        lUnitConversion = cmds.listConnections(attrDest, t='unitConversion')
+        if lUnitConversion:
+            uUnitConversion = lUnitConversion[0]
+            lUnitConversionInputAttr = cmds.listConnections('{}.input'.format(uUnitConversion),
+                                                            d=False, p=True)
+            if lUnitConversionInputAttr:
+                lNewName = lUnitConversionInputAttr[0].replace('.', '_').split('_')
+                if lNewName[0] == 'Jnt':
+                    del lNewName[3]
+                lNewName[0] = 'UnitC'
+                lNewName.append('1')
+                cmds.rename(uUnitConversion, '_'.join(lNewName))
+        return
     # Get the unit conversion node connected to the attribute
     lUnitConversion = pm.listConnections(attrDest, t='unitConversion')
     if lUnitConversion:
@@ -214,10 +378,19 @@ def hasOffsetXform(xCtrl):
     Used to determine if an offset group needs to be created for properly oriented rigging controls.
 
     Args:
-        xCtrl (xform): transform (control curve) to check the parent of
+        xCtrl (xform or str): transform (control curve) to check the parent of
     Returns:
         bool: whether or not the parent is an offset transform
     """
+    if isinstance(xCtrl, basestring):
+        uParent = _getParent(xCtrl)
+        if uParent is None:
+            return False
+        elif cmds.listRelatives(uParent, s=True):
+            return False
+        elif len(cmds.listRelatives(uParent, typ='transform') or []) > 1:
+            return False
+        return True
     xParent = xCtrl.getParent()
     if xParent is None:
         # xCtrl is a parented to the world
@@ -231,6 +404,7 @@ def hasOffsetXform(xCtrl):
     return True
 
 
+@BulkOperation('Create Offset Transform')
 def createOffsetXform(xCtrl, xDriven=None):
     """Creates an offset transform for the provided controller.
 
@@ -239,12 +413,34 @@ def createOffsetXform(xCtrl, xDriven=None):
     controller. The controller shape will not appear to move and the controller's transform
     will be zeroed out.
 
+    If the controller is given as a string, the offset transform is created with maya.cmds and
+    its long name is returned.
+
     Args:
-        xCtrl (xform): transform (control curve) to create the offset group for
-        xDriven (xform, optional): transform to get pivot position and orientation from
+        xCtrl (xform or str): transform (control curve) to create the offset group for
+        xDriven (xform or str, optional): transform to get pivot position and orientation from
     Returns:
-        xform: the offset transform
+        xform or str: the offset transform
     """
+    if isinstance(xCtrl, basestring):
+        uCtrl = _getLongName(xCtrl)
+        lSplit = getObjectName(uCtrl.rsplit('|', 1)[-1]).split('_')
+        uOffset = cmds.createNode('transform',
+                                  n='Xform_{}_{}{}'.format(lSplit[1], lSplit[2], lSplit[0]))
+        if xDriven is None:
+            reposition(uCtrl, uOffset)
+        else:
+            uDriven = _getListOfObjectNames(xDriven)[0]
+            reposition(uDriven, uOffset)
+            lDrivenRotatePivot = cmds.xform(uDriven, q=True, rp=True, ws=True)
+            cmds.xform(uCtrl, piv=lDrivenRotatePivot, ws=True)
+        uParent = _getParent(uCtrl)
+        if uParent is not None:
+            uOffset = cmds.parent(uOffset, uParent)[0]
+        uOffset = _getLongName(uOffset)
+        uCtrl = cmds.parent(uCtrl, uOffset)[0]
+        cmds.makeIdentity(uCtrl, a=True, t=True, r=True, s=True, n=0, pn=True)
+        return uOffset
     lSplit = xCtrl.split('_')
     # Ctrl_L_Hand
     # Xform_L_HandCtrl
@@ -1,7 +1,20 @@
 """This module contains functions to create curves."""
+import json
+import os
+import numpy as np
+import maya.api.OpenMaya as om
 import maya.cmds as cmds
 import maya.mel as mel
 import pymel.core as pm
+from . import common
+
+# Path of the JSON file that captured curve shapes are stored in. Can be overridden with the
+# JYLIB_CURVE_LIBRARY environment variable.
+LIBRARYPATH = os.environ.get('JYLIB_CURVE_LIBRARY') or os.path.join(
+    cmds.internalVar(userAppDir=True), 'jyLib', 'curvelibrary.json')
+
+# Left/right control pairs found by getControlPairs, keyed by the scene they were found in
+_dictPairCache = {}
 
 
 def cuboid(fXLength, fYLength, fZLength, uName='cuboid1', lPosition=(0, 0, 0)):
@@ -47,6 +60,8 @@ def cuboid(fXLength, fYLength, fZLength, uName='cuboid1', lPosition=(0, 0, 0)):
 def create(uType, uName=None, lPosition=(0, 0, 0)):
     """Creates a curve based on the provided type based on the data in the CURVEINFO dictionary.
 
+    If the type has multiple shapes, all of them are created under the same transform.
+
     Args:
         uType (str): type of curve
         uName (str, optional): name of the curve. Defaults to the type of curve with a number
@@ -56,12 +71,254 @@ def create(uType, uName=None, lPosition=(0, 0, 0)):
     """
     if uName is None:
         uName = '{}1'.format(uType)
-    crvResult = pm.curve(n=uName, d=CURVEINFO[uType]['degree'], p=CURVEINFO[uType]['cvs'])
+    lShapes = CURVEINFO[uType].get('shapes', [CURVEINFO[uType]])
+    crvResult = pm.curve(n=uName, **_getCurveFlags(lShapes[0]))
+    for i, dictShape in enumerate(lShapes[1:], 2):
+        crvAdded = pm.curve(**_getCurveFlags(dictShape))
+        shapeAdded = pm.parent(crvAdded.getShape(), crvResult, s=True, r=True)[0]
+        pm.rename(shapeAdded, '{}Shape{}'.format(crvResult.name(), i))
+        pm.delete(crvAdded)
     pm.move(lPosition[0], lPosition[1], lPosition[2], crvResult, ws=True, a=True)
     pm.makeIdentity(crvResult, a=True, t=True, r=True, s=True, n=0, pn=True)
     return crvResult
 
 
+def _getCurveFlags(dictShape):
+    """Converts a shape from the CURVEINFO dictionary into the flags of the curve command.
+
+    Args:
+        dictShape (dict): shape with cvs, degree and optionally knots and periodic keys
+    Returns:
+        dict: flags of the curve command
+    """
+    dictFlags = {'d': dictShape['degree'], 'p': dictShape['cvs']}
+    if dictShape.get('knots') is not None:
+        dictFlags['k'] = dictShape['knots']
+    if dictShape.get('periodic'):
+        dictFlags['per'] = True
+    return dictFlags
+
+
+def capture(lXforms, lNames=None, bNormalize=True, bSave=True):
+    """Captures the shapes of curve transforms into the CURVEINFO dictionary.
+
+    All the curve shapes of all the transforms are read in a single pass. The CVs are read in
+    object space, so every shape under a transform keeps its placement relative to the
+    others. If bNormalize is True, the shapes of each transform are centered on the origin and
+    scaled so the largest side of their bounding box is 1.
+
+    Args:
+        lXforms (list of xforms): curve transforms to capture
+        lNames (list of str, optional): names of the captured types. Defaults to the names of
+            the transforms without namespaces
+        bNormalize (bool, optional): whether the shapes are centered and unit-sized
+        bSave (bool, optional): whether the captured types are saved to LIBRARYPATH
+    Returns:
+        dict: the captured types in the same form as CURVEINFO
+    """
+    lXforms = [cmds.ls(x, long=True)[0] for x in common._getListOfObjectNames(lXforms)]
+    if lNames is None:
+        lNames = [x.rsplit('|', 1)[-1].rsplit(':', 1)[-1] for x in lXforms]
+    elif len(lNames) != len(lXforms):
+        cmds.error('{} names were given for {} transforms.'.format(len(lNames), len(lXforms)))
+    # Get the dag path of each curve shape as it is gathered. A shared selection list would
+    # merge repeated shapes and put the rest under the wrong names
+    lDagPaths = []
+    for uXform in lXforms:
+        lShapes = cmds.listRelatives(uXform, s=True, ni=True, f=True, type='nurbsCurve') or []
+        if not lShapes:
+            cmds.warning('{} has no curve shapes.'.format(uXform))
+        lDagPaths.append([om.MSelectionList().add(x).getDagPath(0) for x in lShapes])
+
+    dictResult = {}
+    for uName, lXformDagPaths in zip(lNames, lDagPaths):
+        lShapes = []
+        for dagShape in lXformDagPaths:
+            fnCurve = om.MFnNurbsCurve(dagShape)
+            lShapes.append({
+                'cvs': [(x.x, x.y, x.z) for x in fnCurve.cvPositions(om.MSpace.kObject)],
+                'degree': fnCurve.degree,
+                'knots': list(fnCurve.knots()),
+                'periodic': fnCurve.form == om.MFnNurbsCurve.kPeriodic,
+            })
+        if not lShapes:
+            continue
+        if bNormalize:
+            _normalizeShapes(lShapes)
+        if len(lShapes) == 1:
+            dictResult[uName] = lShapes[0]
+        else:
+            dictResult[uName] = {'shapes': lShapes}
+
+    CURVEINFO.update(dictResult)
+    if bSave:
+        saveLibrary(dictResult)
+    return dictResult
+
+
+def _normalizeShapes(lShapes):
+    """Centers the shapes on the origin and scales them to a unit-sized bounding box in place.
+
+    Args:
+        lShapes (list of dict): shapes with cvs keys
+    """
+    lAllCVs = [x for dictShape in lShapes for x in dictShape['cvs']]
+    lMin = [min(x[i] for x in lAllCVs) for i in xrange(3)]
+    lMax = [max(x[i] for x in lAllCVs) for i in xrange(3)]
+    lCenter = [(fMin + fMax) / 2.0 for fMin, fMax in zip(lMin, lMax)]
+    fSize = max(fMax - fMin for fMin, fMax in zip(lMin, lMax)) or 1.0
+    for dictShape in lShapes:
+        dictShape['cvs'] = [tuple(round((x[i] - lCenter[i]) / fSize, 10) for i in xrange(3))
+                            for x in dictShape['cvs']]
+
+
+def loadLibrary(uPath=None):
+    """Loads the types saved in the curve library file into the CURVEINFO dictionary.
+
+    Args:
+        uPath (str, optional): path of the library file. Defaults to LIBRARYPATH
+    Returns:
+        dict: the loaded types
+    """
+    uPath = uPath or LIBRARYPATH
+    if not os.path.isfile(uPath):
+        return {}
+    with open(uPath) as fileLibrary:
+        dictLibrary = json.load(fileLibrary)
+    for dictInfo in dictLibrary.itervalues():
+        for dictShape in dictInfo.get('shapes', [dictInfo]):
+            dictShape['cvs'] = [tuple(x) for x in dictShape['cvs']]
+    CURVEINFO.update(dictLibrary)
+    return dictLibrary
+
+
+def saveLibrary(dictTypes, uPath=None):
+    """Adds the types to the curve library file, replacing types with the same names.
+
+    Args:
+        dictTypes (dict): types in the same form as CURVEINFO
+        uPath (str, optional): path of the library file. Defaults to LIBRARYPATH
+    """
+    uPath = uPath or LIBRARYPATH
+    dictLibrary = {}
+    if os.path.isfile(uPath):
+        with open(uPath) as fileLibrary:
+            dictLibrary = json.load(fileLibrary)
+    elif not os.path.isdir(os.path.dirname(uPath)):
+        os.makedirs(os.path.dirname(uPath))
+    dictLibrary.update(dictTypes)
+    with open(uPath, 'w') as fileLibrary:
+        json.dump(dictLibrary, fileLibrary, indent=4, sort_keys=True)
+
+
+def getControlPairs(bRefresh=False):
+    """Finds every pair of left and right controls in the scene by their names.
+
+    Controls are named Ctrl_<side>_<name>, for example Ctrl_L_Hand and Ctrl_R_Hand, and may be
+    in a namespace. All controls are found with a single query and the pairs are cached for
+    the current scene until another scene is opened or a new scene is made. Unsaved scenes are
+    not cached. Pairs whose controls were deleted are dropped from the cached result.
+
+    Args:
+        bRefresh (bool, optional): whether the scene is searched again instead of using the cache
+    Returns:
+        list: list of (left control, right control) long names
+    """
+    uScene = cmds.file(q=True, sn=True)
+    if uScene and not bRefresh and uScene in _dictPairCache:
+        lPairs = _dictPairCache[uScene]
+        setExisting = set(cmds.ls([x for tPair in lPairs for x in tPair], long=True))
+        return [tPair for tPair in lPairs if tPair[0] in setExisting and tPair[1] in setExisting]
+
+    dictRight = {}
+    lLeft = []
+    for uCtrl in cmds.ls('Ctrl_*_*', type='transform', long=True, recursive=True):
+        uLeaf = uCtrl.rsplit('|', 1)[-1]
+        lSplit = common.getObjectName(uLeaf).split('_')
+        if lSplit[1] == 'L':
+            lLeft.append((uLeaf, uCtrl))
+        elif lSplit[1] == 'R':
+            dictRight.setdefault(uLeaf, uCtrl)
+    lPairs = []
+    for uLeaf, uCtrl in lLeft:
+        uNamespace = common.getNamespace(uLeaf)
+        lSplit = common.getObjectName(uLeaf).split('_')
+        lSplit[1] = 'R'
+        uRightLeaf = '_'.join(lSplit)
+        if uNamespace:
+            uRightLeaf = '{}:{}'.format(uNamespace, uRightLeaf)
+        if uRightLeaf in dictRight:
+            lPairs.append((uCtrl, dictRight[uRightLeaf]))
+    if uScene:
+        _dictPairCache[uScene] = lPairs
+    return lPairs
+
+
+def _clearPairCache(*args):
+    """Forgets the cached control pairs. Called when a scene is opened or a new scene is made."""
+    _dictPairCache.clear()
+
+
+def _addSceneCallbacks():
+    """Adds the callbacks that clear the control pair cache when the scene changes.
+
+    The callbacks added by a previous import of the module are removed first, so reloading
+    the module does not add them again.
+
+    Returns:
+        list: the callback ids
+    """
+    for iCallback in globals().get('_lSceneCallbacks', []):
+        om.MMessage.removeCallback(iCallback)
+    return [om.MSceneMessage.addCallback(x, _clearPairCache)
+            for x in (om.MSceneMessage.kAfterOpen, om.MSceneMessage.kAfterNew)]
+
+
+@common.BulkOperation('Mirror Control Shapes')
+def mirrorControlShapes(uFromSide='L', bRefresh=False):
+    """Mirrors the shapes of the controls on one side onto the matching controls on the other.
+
+    The CVs of each source shape are read in world space in one query, mirrored across the YZ
+    plane and written into the object space of the matching shape in one setAttr. Shapes are
+    matched by their order under the control. Pairs with a different number of shapes or CVs
+    are skipped with a warning.
+
+    Args:
+        uFromSide (str, optional): side that is mirrored (L or R)
+        bRefresh (bool, optional): whether the control pairs are searched for again
+    Returns:
+        list: list of the controls that were changed
+    """
+    lChanged = []
+    for uLeft, uRight in getControlPairs(bRefresh):
+        uSource, uTarget = (uLeft, uRight) if uFromSide == 'L' else (uRight, uLeft)
+        lSourceShapes = cmds.listRelatives(uSource, s=True, ni=True, f=True,
+                                           type='nurbsCurve') or []
+        lTargetShapes = cmds.listRelatives(uTarget, s=True, ni=True, f=True,
+                                           type='nurbsCurve') or []
+        if len(lSourceShapes) != len(lTargetShapes):
+            cmds.warning('{} and {} have a different number of shapes. Skipping.'.format(
+                uSource, uTarget))
+            continue
+        aInverse = np.linalg.inv(np.array(cmds.xform(uTarget, q=True, ws=True, m=True),
+                                          dtype=float).reshape(4, 4))
+        for uSourceShape, uTargetShape in zip(lSourceShapes, lTargetShapes):
+            aCVs = np.array(cmds.xform('{}.cv[*]'.format(uSourceShape), q=True, ws=True, t=True),
+                            dtype=float).reshape(-1, 3)
+            iTargetCount = len(cmds.xform('{}.cv[*]'.format(uTargetShape), q=True, os=True,
+                                          t=True)) // 3
+            if len(aCVs) != iTargetCount:
+                cmds.warning('{} and {} have a different number of CVs. Skipping.'.format(
+                    uSourceShape, uTargetShape))
+                continue
+            aCVs[:, 0] *= -1
+            aLocal = np.hstack([aCVs, np.ones((len(aCVs), 1))]).dot(aInverse)[:, :3]
+            cmds.setAttr('{}.controlPoints[0:{}]'.format(uTargetShape, len(aLocal) - 1),
+                         *aLocal.ravel().tolist())
+        lChanged.append(uTarget)
+    return lChanged
+
+
 CURVEINFO = {
     'cube': {
         'cvs': [
@@ -282,3 +539,6 @@ CURVEINFO = {
         'degree': 3,
     },
 }
+
+loadLibrary()
+_lSceneCallbacks = _addSceneCallbacks()
@@ -0,0 +1,177 @@
+"""This module contains batched geometry functions that work on arrays of points.
+
+Nothing in this module depends on Maya, so it can be used, tested and benchmarked
+outside of a Maya session. Points are passed as array-likes of shape (N, 3) or (3,).
+"""
+import numpy as np
+
+# Axis order of each of Maya's rotate orders (xyz, yzx, zxy, xzy, yxz, zyx)
+ROTATEORDERS = ((0, 1, 2), (1, 2, 0), (2, 0, 1), (0, 2, 1), (1, 0, 2), (2, 1, 0))
+
+
+def _asPoints(aPoints):
+    """Converts the given points into a float array with at least one row.
+
+    Args:
+        aPoints (array-like): a single point or a list of points
+    Returns:
+        ndarray: (N, 3) array of points
+    """
+    return np.atleast_2d(np.asarray(aPoints, dtype=float))
+
+
+def _normalize(aVectors):
+    """Normalizes each row of the given vectors.
+
+    Vectors with no length are returned unchanged.
+
+    Args:
+        aVectors (ndarray): (N, 3) array of vectors
+    Returns:
+        ndarray: (N, 3) array of unit vectors
+    """
+    aLengths = np.sqrt(np.einsum('ij,ij->i', aVectors, aVectors))
+    aLengths[aLengths == 0] = 1.0
+    return aVectors / aLengths[:, np.newaxis]
+
+
+def midpoints(aPoints1, aPoints2):
+    """Gets the midpoints between two sets of points.
+
+    Args:
+        aPoints1 (array-like): (N, 3) array of points
+        aPoints2 (array-like): (N, 3) array of points
+    Returns:
+        ndarray: (N, 3) array of midpoints
+    """
+    return (_asPoints(aPoints1) + _asPoints(aPoints2)) * 0.5
+
+
+def isclose(a, b, rel_tol=1e-09, abs_tol=0.00001):
+    """Determines which values are close based on a tolerance.
+
+    Works element-wise on scalars or arrays of any matching shape.
+
+    Args:
+        a (float or array-like): first values
+        b (float or array-like): second values
+        rel_tol (float, optional): relative tolerance
+        abs_tol (float, optional): absolute tolerance
+    Returns:
+        bool or ndarray: whether or not each pair of values is close
+    """
+    a = np.asarray(a, dtype=float)
+    b = np.asarray(b, dtype=float)
+    return np.abs(a - b) <= np.maximum(rel_tol * np.maximum(np.abs(a), np.abs(b)), abs_tol)
+
+
+def pointsClose(aPoints1, aPoints2, rel_tol=1e-09, abs_tol=0.00001):
+    """Determines which points are close to each other on all three axes.
+
+    Args:
+        aPoints1 (array-like): (N, 3) array of points
+        aPoints2 (array-like): (N, 3) array of points
+        rel_tol (float, optional): relative tolerance
+        abs_tol (float, optional): absolute tolerance
+    Returns:
+        ndarray: (N,) boolean array
+    """
+    return isclose(_asPoints(aPoints1), _asPoints(aPoints2), rel_tol, abs_tol).all(axis=1)
+
+
+def closestPointsOnPlanes(aPlane1, aPlane2, aPlane3, aPoints):
+    """Calculates the closest points on planes defined by 3 points from the provided points.
+
+    Each plane argument can either be a single point, which is shared by all the provided
+    points, or an (N, 3) array with one plane per point.
+
+    Args:
+        aPlane1 (array-like): point1 on the plane(s)
+        aPlane2 (array-like): point2 on the plane(s)
+        aPlane3 (array-like): point3 on the plane(s)
+        aPoints (array-like): (N, 3) array of points to find the closest points from
+    Returns:
+        ndarray: (N, 3) array of points on the plane(s)
+    """
+    aPlane1 = _asPoints(aPlane1)
+    aPoints = _asPoints(aPoints)
+    aNormals = _normalize(np.cross(_asPoints(aPlane2) - aPlane1, _asPoints(aPlane3) - aPlane1))
+    aDistances = np.einsum('ij,ij->i', np.broadcast_to(aNormals, aPoints.shape),
+                           aPoints - aPlane1)
+    return aPoints - aDistances[:, np.newaxis] * aNormals
+
+
+def poleVectorPositions(aStart, aMid, aEnd, fDistance=None):
+    """Calculates pole vector positions for many three joint limbs at once.
+
+    The pole vector is placed on the plane of each limb, pointing away from the line between
+    the start and end joints through the middle joint. Straight limbs do not define a
+    direction, so their pole vector is placed on the middle joint.
+
+    Args:
+        aStart (array-like): (N, 3) array of start joint positions (shoulders, hips)
+        aMid (array-like): (N, 3) array of middle joint positions (elbows, knees)
+        aEnd (array-like): (N, 3) array of end joint positions (wrists, ankles)
+        fDistance (float or array-like, optional): distance from the middle joint.
+            Defaults to the length of each limb
+    Returns:
+        ndarray: (N, 3) array of pole vector positions
+    """
+    aStart = _asPoints(aStart)
+    aMid = _asPoints(aMid)
+    aEnd = _asPoints(aEnd)
+    aLimb = aEnd - aStart
+    aLimbLengthSq = np.einsum('ij,ij->i', aLimb, aLimb)
+    aLimbLengthSq[aLimbLengthSq == 0] = 1.0
+    # Project the middle joint onto the line from the start to the end joint
+    aParam = np.einsum('ij,ij->i', aMid - aStart, aLimb) / aLimbLengthSq
+    aProjected = aStart + aParam[:, np.newaxis] * aLimb
+    aDirections = _normalize(aMid - aProjected)
+    if fDistance is None:
+        aDistances = (np.linalg.norm(aMid - aStart, axis=1) +
+                      np.linalg.norm(aEnd - aMid, axis=1))
+    else:
+        aDistances = np.broadcast_to(np.asarray(fDistance, dtype=float), aParam.shape)
+    return aMid + aDirections * aDistances[:, np.newaxis]
+
+
+def normalizeRotations(aMatrices):
+    """Removes the scale from rotation matrices by normalizing each row.
+
+    Args:
+        aMatrices (array-like): (..., 3, 3) or (..., 4, 4) array of matrices
+    Returns:
+        ndarray: (..., 3, 3) array of rotation matrices
+    """
+    aRotations = np.asarray(aMatrices, dtype=float)[..., :3, :3]
+    aLengths = np.linalg.norm(aRotations, axis=-1)
+    aLengths[aLengths == 0] = 1.0
+    return aRotations / aLengths[..., np.newaxis]
+
+
+def eulerFromMatrices(aMatrices, iRotateOrder=0, bUnwrap=True):
+    """Converts rotation matrices into Euler rotations in radians.
+
+    The matrices use Maya's row vector convention, where the rotation of the rotate order xyz
+    is Rx * Ry * Rz.
+
+    Args:
+        aMatrices (array-like): (N, 3, 3) or (N, 4, 4) array of rotation matrices, or a
+            single matrix
+        iRotateOrder (int, optional): Maya rotate order (0 is xyz)
+        bUnwrap (bool, optional): whether jumps of more than 180 degrees between consecutive
+            rotations are removed, which keeps baked animation continuous
+    Returns:
+        ndarray: (N, 3) array of X, Y and Z rotations
+    """
+    aRotations = normalizeRotations(aMatrices)
+    i, j, k = ROTATEORDERS[iRotateOrder]
+    # The sign flips for rotate orders that are not a cyclic permutation of xyz
+    fSign = 1.0 if (j - i) % 3 == 1 else -1.0
+    aResult = np.empty(aRotations.shape[:-2] + (3,))
+    aResult[..., i] = np.arctan2(fSign * aRotations[..., j, k], aRotations[..., k, k])
+    aResult[..., j] = np.arcsin(np.clip(-fSign * aRotations[..., i, k], -1.0, 1.0))
+    aResult[..., k] = np.arctan2(fSign * aRotations[..., i, j], aRotations[..., i, i])
+    if bUnwrap and aResult.ndim > 1:
+        aResult = np.unwrap(aResult, axis=0)
+    return aResult
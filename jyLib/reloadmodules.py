@@ -1,13 +1,21 @@
+import sys
 import jyLib
 
 def refresh():
     reload(jyLib)
+    if 'jyLib.batch' in sys.modules:
+        # The batch driver is not imported by the package
+        reload(jyLib.batch)
+    reload(jyLib.geometry)
+    reload(jyLib.thumbnails)
     reload(jyLib.common)
+    reload(jyLib.benchmarks)
     reload(jyLib.commonui)
     reload(jyLib.curves)
 
     reload(jyLib.rigger)
     reload(jyLib.rigger.ikfklimb)
+    reload(jyLib.rigger.profiler)
 
     reload(jyLib.tools)
     reload(jyLib.tools.blendshapemirrorhelper)
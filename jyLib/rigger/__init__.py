@@ -1 +1,2 @@
-from . import ikfklimb
\ No newline at end of file
+from . import ikfklimb
+from . import profiler
\ No newline at end of file
@@ -1,10 +1,20 @@
 import itertools
+import numpy as np
+import maya.api.OpenMaya as om
 import maya.cmds as cmds
 import maya.mel as mel
 import pymel.core as pm
 import pymel.core.datatypes as dt
 from .. import common
+from .. import geometry
 
+# Number of frames checked after matching
+CHECKFRAMES = 3
+# Largest difference in degrees between a matched node and its target
+MATCHTOLERANCE = 0.01
+
+
+@common.BulkOperation('Create IKFK Limb')
 def create(lJoints):
     """Creates matching IK and FK chains and connects them with the bind chain with blend colors.
 
@@ -56,6 +66,7 @@ def create(lJoints):
     return (lIKJoints, lFKJoints, lBlendColors)
 
 
+@common.BulkOperation('Rig IKFK Limb')
 def rig(lIKJoints, lFKJoints, lBlendColors, uName, xIKEndCtrl=None, xIKPVCtrl=None,
         lFKCtrls=None, xIKFKSwitchCtrl=None):
     """Rigs the IKFK limb to the provided controls.
@@ -123,3 +134,249 @@ def rig(lIKJoints, lFKJoints, lBlendColors, uName, xIKEndCtrl=None, xIKPVCtrl=No
                                  itt='linear', ott='linear')
             pm.setDrivenKeyframe(blendcCurrent.blender, v=1, cd=xIKFKSwitchCtrl.IKFK, dv=10,
                                  itt='linear', ott='linear')
+
+
+@common.BulkOperation('Match FK To IK')
+def matchFKToIK(lIKJoints, lFKJoints, iStart, iEnd, lFKCtrls=None):
+    """Bakes the FK chain to match the IK chain over a frame range.
+
+    If FK controls are provided, their rotations are keyed so that their world orientations
+    match the IK joints, which is what the orient constraints created by rig expect. Otherwise
+    the FK joints are keyed with the rotations of the IK joints directly. Every value is read
+    at each frame instead of changing the current time, with the matrices of all the nodes
+    read in one DG context per frame. The rotations are solved for all frames at once and each attribute gets all of its keys in one call. The baked
+    world orientations are compared with the IK joints at a few frames afterwards.
+
+    Args:
+        lIKJoints (list of joints): the IK chain
+        lFKJoints (list of joints): the FK chain
+        iStart (int): first frame of the range
+        iEnd (int): last frame of the range
+        lFKCtrls (list of xforms, optional): the list of FK controllers matching the chain
+    Returns:
+        bool: whether the baked FK chain matches the IK chain
+    """
+    lIKJoints = common._getListOfObjectNames(lIKJoints)
+    lFKJoints = common._getListOfObjectNames(lFKJoints)
+    lFrames = range(iStart, iEnd + 1)
+    if lFKCtrls is None:
+        # The FK and IK chains are duplicates of the same chain, so their rotations match
+        for uIKJoint, uFKJoint in itertools.izip(lIKJoints, lFKJoints):
+            aRotations = np.array([cmds.getAttr('{}.rotate'.format(uIKJoint), time=x)[0]
+                                   for x in lFrames])
+            for i, uAxis in enumerate('XYZ'):
+                _bakeKeys(uFKJoint, 'rotate' + uAxis, lFrames, aRotations[:, i])
+        return _checkMatch(lFKJoints, lIKJoints, lFrames)
+
+    # Long names are needed to find which controllers are nested under each other
+    lFKCtrls = [cmds.ls(x, long=True)[0] for x in common._getListOfObjectNames(lFKCtrls)]
+    lIKJoints = lIKJoints[:len(lFKCtrls)]
+    iCount = len(lIKJoints)
+    fAngleScale = _getAngleScale()
+    # Every matrix is read before any key is written, since keying a controller changes the
+    # matrices of the controllers below it
+    aMatrices = _getMatrices(['{}.worldMatrix[0]'.format(x) for x in lIKJoints] +
+                             ['{}.parentMatrix[0]'.format(x) for x in lFKCtrls] +
+                             ['{}.worldMatrix[0]'.format(x) for x in lFKCtrls], lFrames)
+    aTargets = geometry.normalizeRotations(aMatrices[:iCount])
+    aParents = aMatrices[iCount:2 * iCount]
+    aWorlds = aMatrices[2 * iCount:]
+
+    # Long name of each matched controller to its old and new world matrices
+    dictMatched = {}
+    for uCtrl, aTarget, aParent, aWorld in itertools.izip(lFKCtrls, aTargets, aParents,
+                                                         aWorlds):
+        aLocal = np.matmul(aWorld, np.linalg.inv(aParent))
+        uAncestor = _getMatchedAncestor(uCtrl, dictMatched)
+        if uAncestor is not None:
+            # The parent moves with the closest matched controller above it
+            aOldWorld, aNewWorld = dictMatched[uAncestor]
+            aParent = np.matmul(np.matmul(aParent, np.linalg.inv(aOldWorld)), aNewWorld)
+        aNewRotations = geometry.normalizeRotations(
+            np.matmul(aTarget, np.linalg.inv(aParent[:, :3, :3])))
+        iRotateOrder = cmds.getAttr('{}.rotateOrder'.format(uCtrl))
+        aEuler = geometry.eulerFromMatrices(aNewRotations, iRotateOrder) * fAngleScale
+        for i, uAxis in enumerate('XYZ'):
+            _bakeKeys(uCtrl, 'rotate' + uAxis, lFrames, aEuler[:, i])
+        # Rebuild the controller's new world matrices, keeping its scale and translation
+        aScale = np.linalg.norm(aLocal[:, :3, :3], axis=-1)
+        aNewLocal = aLocal.copy()
+        aNewLocal[:, :3, :3] = aNewRotations * aScale[:, :, np.newaxis]
+        dictMatched[uCtrl] = (aWorld, np.matmul(aNewLocal, aParent))
+    return _checkMatch(lFKCtrls, lIKJoints, lFrames)
+
+
+def _getMatchedAncestor(uNode, dictMatched):
+    """Returns the closest ancestor of the node that has been matched, or None.
+
+    Args:
+        uNode (str): long name of the node
+        dictMatched (dict): matched nodes by long name
+    Returns:
+        str: long name of the ancestor
+    """
+    uAncestor = uNode.rsplit('|', 1)[0]
+    while uAncestor:
+        if uAncestor in dictMatched:
+            return uAncestor
+        uAncestor = uAncestor.rsplit('|', 1)[0]
+    return None
+
+
+def _checkMatch(lNodes, lTargets, lFrames):
+    """Compares the world orientations of the nodes with their targets at a few frames.
+
+    A warning is given for each node that is more than MATCHTOLERANCE degrees off.
+
+    Args:
+        lNodes (list of str): the baked nodes
+        lTargets (list of str): the nodes they were matched to
+        lFrames (list of int): the baked frames
+    Returns:
+        bool: whether every node matches its target
+    """
+    lCheckFrames = sorted(set(lFrames[int(round(x * (len(lFrames) - 1) /
+                                                float(max(CHECKFRAMES - 1, 1))))]
+                              for x in xrange(CHECKFRAMES)))
+    iCount = min(len(lNodes), len(lTargets))
+    aMatrices = geometry.normalizeRotations(_getMatrices(
+        ['{}.worldMatrix[0]'.format(x) for x in list(lNodes[:iCount]) + list(lTargets[:iCount])],
+        lCheckFrames))
+    bMatch = True
+    for uNode, uTarget, aRotations, aTargets in itertools.izip(
+            lNodes, lTargets, aMatrices[:iCount], aMatrices[iCount:]):
+        # The angle of the rotation between the two orientations
+        aCos = (np.einsum('nij,nij->n', aRotations, aTargets) - 1.0) * 0.5
+        fDeviation = np.degrees(np.arccos(np.clip(aCos, -1.0, 1.0))).max()
+        if fDeviation > MATCHTOLERANCE:
+            cmds.warning('{} is {:.3f} degrees off from {}.'.format(uNode, fDeviation, uTarget))
+            bMatch = False
+    return bMatch
+
+
+@common.BulkOperation('Match IK To FK')
+def matchIKToFK(lIKJoints, lFKJoints, iStart, iEnd, xIKEndCtrl, xIKPVCtrl=None,
+                fPVDistance=None):
+    """Bakes the IK controllers to match the FK chain over a frame range.
+
+    The IK end controller is keyed to the position and orientation of the last FK joint. The
+    pole vector controller is keyed onto the plane of the FK chain, pointing out from the
+    middle joint. Every matrix is read in one DG context per frame instead of changing the
+    current time, the positions are solved for all frames at once and each attribute gets all
+    of its keys in one call. Positions are converted from centimeters into the scene's linear
+    unit. The world orientations of the IK joints are compared with the FK joints at a few
+    frames afterwards.
+
+    Args:
+        lIKJoints (list of joints): the IK chain
+        lFKJoints (list of joints): the FK chain
+        iStart (int): first frame of the range
+        iEnd (int): last frame of the range
+        xIKEndCtrl (xform): the IK end controller
+        xIKPVCtrl (xform, optional): the IK pole vector controller
+        fPVDistance (float, optional): distance of the pole vector from the middle joint in
+            the scene's linear unit. Defaults to the length of the limb
+    Returns:
+        bool: whether the IK chain matches the FK chain
+    """
+    lIKJoints = common._getListOfObjectNames(lIKJoints)
+    lFKJoints = common._getListOfObjectNames(lFKJoints)
+    lFrames = range(iStart, iEnd + 1)
+    fAngleScale = _getAngleScale()
+    fLinearScale = _getLinearScale()
+
+    uEndCtrl = common._getListOfObjectNames(xIKEndCtrl)[0]
+    aStart, aMid, aTarget, aParent = _getMatrices(
+        ['{}.worldMatrix[0]'.format(x) for x in (lFKJoints[0], lFKJoints[1], lFKJoints[-1])] +
+        ['{}.parentMatrix[0]'.format(uEndCtrl)], lFrames)
+    aTarget[:, :3, :3] = geometry.normalizeRotations(aTarget)
+    aLocal = np.matmul(aTarget, np.linalg.inv(aParent))
+    iRotateOrder = cmds.getAttr('{}.rotateOrder'.format(uEndCtrl))
+    aEuler = geometry.eulerFromMatrices(aLocal, iRotateOrder) * fAngleScale
+    for i, uAxis in enumerate('XYZ'):
+        _bakeKeys(uEndCtrl, 'translate' + uAxis, lFrames, aLocal[:, 3, i] * fLinearScale)
+        _bakeKeys(uEndCtrl, 'rotate' + uAxis, lFrames, aEuler[:, i])
+
+    if xIKPVCtrl is not None:
+        uPVCtrl = common._getListOfObjectNames(xIKPVCtrl)[0]
+        if fPVDistance is not None:
+            fPVDistance = fPVDistance / fLinearScale
+        aPositions = geometry.poleVectorPositions(aStart[:, 3, :3], aMid[:, 3, :3],
+                                                  aTarget[:, 3, :3], fPVDistance)
+        aPositions = np.hstack([aPositions, np.ones((len(aPositions), 1))])
+        # Read after the end controller is keyed, in case the pole vector is parented under it
+        aPVParent = _getMatrices(['{}.parentMatrix[0]'.format(uPVCtrl)], lFrames)[0]
+        aLocal = np.einsum('ij,ijk->ik', aPositions, np.linalg.inv(aPVParent))
+        for i, uAxis in enumerate('XYZ'):
+            _bakeKeys(uPVCtrl, 'translate' + uAxis, lFrames, aLocal[:, i] * fLinearScale)
+    return _checkMatch(lIKJoints, lFKJoints, lFrames)
+
+
+def _getMatrices(lPlugs, lFrames):
+    """Reads matrix attributes at each frame without changing the current time.
+
+    All the plugs are evaluated in a single DG context for each frame, so the nodes upstream
+    of several plugs are only evaluated once per frame.
+
+    Args:
+        lPlugs (list of str): matrix plugs, for example 'joint1.worldMatrix[0]'
+        lFrames (list of int): frames to read
+    Returns:
+        ndarray: (P, N, 4, 4) array of the matrices of each plug at each frame
+    """
+    # Each plug gets its own selection list, since a shared one would merge repeated plugs
+    lMPlugs = [om.MSelectionList().add(x).getPlug(0) for x in lPlugs]
+    aMatrices = np.empty((len(lMPlugs), len(lFrames), 4, 4))
+    uUnit = om.MTime.uiUnit()
+    for j, iFrame in enumerate(lFrames):
+        context = om.MDGContext(om.MTime(iFrame, uUnit))
+        for i, plug in enumerate(lMPlugs):
+            matrix = om.MFnMatrixData(plug.asMObject(context)).matrix()
+            aMatrices[i, j] = np.reshape(list(matrix), (4, 4))
+    return aMatrices
+
+
+def _getAngleScale():
+    """Returns the factor that converts radians into the scene's angular unit."""
+    if cmds.currentUnit(q=True, angle=True) == 'rad':
+        return 1.0
+    return 180.0 / np.pi
+
+
+def _getLinearScale():
+    """Returns the factor that converts centimeters into the scene's linear unit."""
+    dictScales = {'mm': 10.0, 'cm': 1.0, 'm': 0.01, 'km': 0.00001, 'in': 1.0 / 2.54,
+                  'ft': 1.0 / 30.48, 'yd': 1.0 / 91.44}
+    return dictScales[cmds.currentUnit(q=True, linear=True)]
+
+
+def _bakeKeys(uNode, uAttr, lFrames, aValues):
+    """Keys an attribute at every frame in bulk, editing its animation curve in place.
+
+    The keys are written into a temporary curve with a single setAttr and pasted over the
+    frame range, which replaces the keys in the range. The keys outside the range keep their
+    tangents and the curve keeps its infinity and weighting. If the attribute is not animated,
+    the paste creates a new curve.
+
+    Args:
+        uNode (str): name of the node
+        uAttr (str): name of the attribute
+        lFrames (list of int): frames to key
+        aValues (array-like): value at each frame
+    """
+    uPlug = '{}.{}'.format(uNode, uAttr)
+    for uSource in cmds.listConnections(uPlug, s=True, d=False) or []:
+        # Driven keys, constraints and animation layers can not be baked over
+        if not cmds.nodeType(uSource).startswith('animCurveT'):
+            cmds.error('{} is driven by {}, which is not a time based animation curve.'.format(
+                uPlug, uSource))
+    uCurveType = 'animCurveTA' if uAttr.startswith('rotate') else 'animCurveTL'
+    uCurve = cmds.createNode(uCurveType, n='{}_{}_bake'.format(uNode.rsplit('|', 1)[-1], uAttr))
+    try:
+        lKeyValues = [float(x) for tKey in itertools.izip(lFrames, aValues) for x in tKey]
+        cmds.setAttr('{}.ktv[0:{}]'.format(uCurve, len(lFrames) - 1), *lKeyValues)
+        cmds.keyTangent(uCurve, itt='linear', ott='linear')
+        cmds.copyKey(uCurve)
+        cmds.pasteKey(uPlug, option='replace', time=(lFrames[0], lFrames[-1]))
+    finally:
+        cmds.delete(uCurve)
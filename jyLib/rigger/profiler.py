@@ -0,0 +1,182 @@
+"""This module contains functions to profile the rigs built by ikfklimb.
+
+Builds are recorded by running each jyLib call through record, which keeps the nodes the call
+created grouped by limb. The recorded limbs can then be listed by node type and their
+evaluation can be timed by driving the IKFK switch and a sample of controls.
+
+Example:
+    lIKJoints, lFKJoints, lBlendColors = profiler.record('L_Arm', ikfklimb.create, lJoints)
+    profiler.record('L_Arm', ikfklimb.rig, lIKJoints, lFKJoints, lBlendColors, 'L_Arm', ...)
+    profiler.writeReport(uPath, [profiler.profileEvaluation('L_Arm', iFrames=200)])
+"""
+import collections
+import json
+import math
+import time
+import maya.cmds as cmds
+from .. import common
+
+# Nodes created by recorded calls: limb name -> list of (call name, list of node UUIDs)
+BUILDS = collections.OrderedDict()
+
+
+def record(uLimb, func, *args, **kwargs):
+    """Runs a jyLib call and records the nodes it created under the limb.
+
+    Args:
+        uLimb (str): name of the limb the call builds
+        func (function): the call, for example ikfklimb.create
+        *args: arguments of the call
+        **kwargs: keyword arguments of the call
+    Returns:
+        the result of the call
+    """
+    setBefore = set(cmds.ls(uuid=True))
+    try:
+        return func(*args, **kwargs)
+    finally:
+        lCreated = [x for x in cmds.ls(uuid=True) if x not in setBefore]
+        BUILDS.setdefault(uLimb, []).append((func.__name__, lCreated))
+
+
+def clear():
+    """Forgets every recorded build."""
+    BUILDS.clear()
+
+
+def _getNodes(lUuids):
+    """Returns the long names and types of the nodes that still exist.
+
+    Args:
+        lUuids (list of str): node UUIDs
+    Returns:
+        list: list of (long name, node type)
+    """
+    if not lUuids:
+        return []
+    lResult = cmds.ls(lUuids, long=True, showType=True) or []
+    return zip(lResult[::2], lResult[1::2])
+
+
+def getNodeReport(uLimb=None):
+    """Lists the nodes each recorded call created, grouped by limb and node type.
+
+    Args:
+        uLimb (str, optional): limb to report. Defaults to every recorded limb
+    Returns:
+        dict: limb name to a dictionary with the node count, the count of each node type,
+            the nodes of each type and the count of each node type per call
+    """
+    dictReport = collections.OrderedDict()
+    for uCurrentLimb, lCalls in BUILDS.iteritems():
+        if uLimb is not None and uCurrentLimb != uLimb:
+            continue
+        dictTypes = collections.defaultdict(list)
+        dictCalls = collections.OrderedDict()
+        for uCall, lUuids in lCalls:
+            dictCallTypes = dictCalls.setdefault(uCall, collections.defaultdict(int))
+            for uNode, uType in _getNodes(lUuids):
+                dictTypes[uType].append(uNode)
+                dictCallTypes[uType] += 1
+        dictReport[uCurrentLimb] = {
+            'nodeCount': sum(len(x) for x in dictTypes.itervalues()),
+            'nodeTypes': dict((x, len(y)) for x, y in dictTypes.iteritems()),
+            'nodes': dict(dictTypes),
+            'calls': dict((x, dict(y)) for x, y in dictCalls.iteritems()),
+        }
+    return dictReport
+
+
+def _findSwitchPlug(dictNodes):
+    """Finds the IKFK attribute that drives the limb's blend colors through driven keys."""
+    for uCurve in dictNodes.get('animCurveUU', []):
+        lInputs = cmds.listConnections('{}.input'.format(uCurve), s=True, d=False, p=True)
+        if lInputs:
+            return lInputs[0]
+    return None
+
+
+def _findOutputs(dictNodes):
+    """Finds the bind joints driven by the limb's blend colors."""
+    lOutputs = []
+    for uBlendColors in dictNodes.get('blendColors', []):
+        lOutputs.extend(cmds.listConnections('{}.output'.format(uBlendColors), s=False,
+                                             d=True, type='joint') or [])
+    return cmds.ls(lOutputs, long=True)
+
+
+@common.BulkOperation('Profile Evaluation', bUndo=False)
+def profileEvaluation(uLimb, lCtrls=None, iFrames=100, uSwitchPlug=None):
+    """Times the evaluation of a recorded limb.
+
+    For each of the frames, the IKFK switch is swept between IK and FK and the rotations of the
+    sample controls are changed, then the world matrices of the bind joints driven by the limb
+    are pulled so that everything upstream of them is evaluated. The changed attributes are
+    restored afterwards and nothing is recorded in the undo queue.
+
+    Args:
+        uLimb (str): name of the recorded limb
+        lCtrls (list of xforms, optional): sample of controls to drive
+        iFrames (int, optional): number of evaluations to time
+        uSwitchPlug (str, optional): IKFK switch attribute. Defaults to the attribute that
+            drives the limb's driven keys
+    Returns:
+        dict: limb name, frames, total seconds, milliseconds per frame and node counts
+    """
+    if uLimb not in BUILDS:
+        cmds.error('{} has not been recorded.'.format(uLimb))
+    dictNodes = getNodeReport(uLimb)[uLimb]
+    lOutputs = _findOutputs(dictNodes['nodes'])
+    if not lOutputs:
+        cmds.error('No bind joints driven by {} were found.'.format(uLimb))
+    uSwitchPlug = uSwitchPlug or _findSwitchPlug(dictNodes['nodes'])
+
+    # Attributes that are driven each frame with a function from the frame to the value
+    lDriven = []
+    if uSwitchPlug is not None:
+        lDriven.append((uSwitchPlug, lambda i: 10.0 * (i % 2)))
+    for uCtrl in common._getListOfObjectNames(lCtrls or []):
+        for uAxis in 'XYZ':
+            uPlug = '{}.rotate{}'.format(uCtrl, uAxis)
+            if cmds.getAttr(uPlug, settable=True):
+                lDriven.append((uPlug, lambda i: 10.0 * math.sin(i * 0.1)))
+    lPulled = ['{}.worldMatrix[0]'.format(x) for x in lOutputs]
+
+    lOriginal = [(uPlug, cmds.getAttr(uPlug)) for uPlug, _ in lDriven]
+    try:
+        fStart = time.time()
+        for i in xrange(iFrames):
+            for uPlug, funcValue in lDriven:
+                cmds.setAttr(uPlug, funcValue(i))
+            for uPlug in lPulled:
+                cmds.getAttr(uPlug)
+        fSeconds = time.time() - fStart
+    finally:
+        for uPlug, fValue in lOriginal:
+            cmds.setAttr(uPlug, fValue)
+
+    return {
+        'limb': uLimb,
+        'frames': iFrames,
+        'seconds': fSeconds,
+        'msPerFrame': fSeconds * 1000.0 / iFrames if iFrames else 0.0,
+        'drivenAttributes': [x for x, _ in lDriven],
+        'outputs': lOutputs,
+        'nodeCount': dictNodes['nodeCount'],
+        'nodeTypes': dictNodes['nodeTypes'],
+    }
+
+
+def writeReport(uPath, lEvaluations=()):
+    """Writes the node report and evaluation timings to a JSON file.
+
+    Args:
+        uPath (str): path of the JSON file
+        lEvaluations (list of dict, optional): results of profileEvaluation
+    """
+    dictReport = {
+        'builds': getNodeReport(),
+        'evaluations': list(lEvaluations),
+    }
+    with open(uPath, 'w') as fileReport:
+        json.dump(dictReport, fileReport, indent=4, sort_keys=True)
@@ -0,0 +1,217 @@
+"""This module contains functions to render curve shapes into small PNG thumbnails.
+
+Nothing in this module depends on Maya. Shapes are given in the same form as the entries of
+curves.CURVEINFO and are drawn with an orthographic projection.
+"""
+import hashlib
+import json
+import math
+import os
+import struct
+import zlib
+
+# Color of the rendered curves as (red, green, blue, alpha)
+CURVECOLOR = (220, 220, 220, 255)
+# Number of samples per span for curves with a degree higher than 1
+SPANSAMPLES = 8
+# Rotation in degrees around the Y and then the X axis used to view shapes that are not flat
+VIEWANGLES = (35.0, -25.0)
+
+
+def getShapeHash(dictInfo):
+    """Gets a hash that changes whenever the CVs, degrees or knots of the type change.
+
+    Args:
+        dictInfo (dict): type in the same form as the entries of CURVEINFO
+    Returns:
+        str: hexadecimal hash
+    """
+    lShapes = [[[list(x) for x in dictShape['cvs']], dictShape['degree'],
+                dictShape.get('knots'), bool(dictShape.get('periodic'))]
+               for dictShape in dictInfo.get('shapes', [dictInfo])]
+    return hashlib.sha1(json.dumps(lShapes).encode('utf-8')).hexdigest()
+
+
+def getThumbnail(dictInfo, uCacheDir, iSize=64):
+    """Gets the path of the thumbnail of the type, rendering it if it is not cached.
+
+    Thumbnails are cached in uCacheDir under the hash of the shape, so a thumbnail is only
+    rendered again when the shape changes.
+
+    Args:
+        dictInfo (dict): type in the same form as the entries of CURVEINFO
+        uCacheDir (str): directory of the cached thumbnails
+        iSize (int, optional): width and height of the thumbnail in pixels
+    Returns:
+        str: path of the PNG file
+    """
+    uPath = os.path.join(uCacheDir, '{}_{}.png'.format(getShapeHash(dictInfo), iSize))
+    if not os.path.isfile(uPath):
+        if not os.path.isdir(uCacheDir):
+            os.makedirs(uCacheDir)
+        # Write to a temporary file first so that a partially written file is never used
+        with open(uPath + '.tmp', 'wb') as filePNG:
+            filePNG.write(render(dictInfo, iSize))
+        if os.path.exists(uPath):
+            os.remove(uPath + '.tmp')
+        else:
+            os.rename(uPath + '.tmp', uPath)
+    return uPath
+
+
+def render(dictInfo, iSize=64, iMargin=4):
+    """Renders the type into a PNG image.
+
+    Args:
+        dictInfo (dict): type in the same form as the entries of CURVEINFO
+        iSize (int, optional): width and height of the image in pixels
+        iMargin (int, optional): empty border around the shape in pixels
+    Returns:
+        bytes: the PNG file data
+    """
+    lPolylines = [sampleCurve(dictShape) for dictShape in dictInfo.get('shapes', [dictInfo])]
+    lPolylines = _project(lPolylines)
+    lAllPoints = [x for lPolyline in lPolylines for x in lPolyline]
+    fMinX = min(x[0] for x in lAllPoints)
+    fMaxX = max(x[0] for x in lAllPoints)
+    fMinY = min(x[1] for x in lAllPoints)
+    fMaxY = max(x[1] for x in lAllPoints)
+    fScale = (iSize - 1 - 2 * iMargin) / (max(fMaxX - fMinX, fMaxY - fMinY) or 1.0)
+    fOffsetX = (iSize - 1 - (fMaxX - fMinX) * fScale) / 2.0
+    fOffsetY = (iSize - 1 - (fMaxY - fMinY) * fScale) / 2.0
+
+    baPixels = bytearray(iSize * iSize * 4)
+    for lPolyline in lPolylines:
+        # Image rows go down, so Y is flipped
+        lPixels = [(int(round((x - fMinX) * fScale + fOffsetX)),
+                    int(round(iSize - 1 - ((y - fMinY) * fScale + fOffsetY))))
+                   for x, y in lPolyline]
+        for tStart, tEnd in zip(lPixels, lPixels[1:]):
+            _drawLine(baPixels, iSize, tStart, tEnd)
+    return _encodePNG(baPixels, iSize, iSize)
+
+
+def sampleCurve(dictShape):
+    """Samples points along a curve shape.
+
+    Degree 1 curves are returned as their CVs. Higher degrees are evaluated with de Boor's
+    algorithm using the shape's knots, or Maya's default uniform knots if it has none.
+
+    Args:
+        dictShape (dict): shape with cvs, degree and optionally knots keys
+    Returns:
+        list: list of (x, y, z) points
+    """
+    lCVs = [tuple(float(x) for x in tCV) for tCV in dictShape['cvs']]
+    iDegree = dictShape['degree']
+    if iDegree == 1 or len(lCVs) <= iDegree:
+        return lCVs
+    lKnots = dictShape.get('knots')
+    if lKnots is None:
+        iSpans = len(lCVs) - iDegree
+        lKnots = [0] * iDegree + list(range(1, iSpans)) + [iSpans] * iDegree
+    # Maya leaves out the first and last knot of the full knot vector
+    lKnots = [float(lKnots[0])] + [float(x) for x in lKnots] + [float(lKnots[-1])]
+    fStart = lKnots[iDegree]
+    fEnd = lKnots[len(lCVs)]
+    iSamples = SPANSAMPLES * (len(lCVs) - iDegree)
+    return [_deBoor(lCVs, lKnots, iDegree, fStart + (fEnd - fStart) * i / float(iSamples))
+            for i in range(iSamples + 1)]
+
+
+def _deBoor(lCVs, lKnots, iDegree, fParam):
+    """Evaluates a B-spline at the parameter with de Boor's algorithm."""
+    # Find the knot span that contains the parameter
+    iSpan = iDegree
+    while iSpan < len(lCVs) - 1 and lKnots[iSpan + 1] <= fParam:
+        iSpan += 1
+    lPoints = [list(lCVs[j + iSpan - iDegree]) for j in range(iDegree + 1)]
+    for r in range(1, iDegree + 1):
+        for j in range(iDegree, r - 1, -1):
+            i = j + iSpan - iDegree
+            fDenominator = lKnots[i + iDegree - r + 1] - lKnots[i]
+            fAlpha = (fParam - lKnots[i]) / fDenominator if fDenominator else 0.0
+            lPoints[j] = [(1.0 - fAlpha) * a + fAlpha * b
+                          for a, b in zip(lPoints[j - 1], lPoints[j])]
+    return tuple(lPoints[iDegree])
+
+
+def _project(lPolylines):
+    """Projects 3D polylines into 2D with an orthographic projection.
+
+    Flat shapes are viewed straight down their flat axis. Other shapes are viewed from an angle
+    so that their depth is visible.
+
+    Args:
+        lPolylines (list): list of lists of (x, y, z) points
+    Returns:
+        list: list of lists of (x, y) points
+    """
+    lAllPoints = [x for lPolyline in lPolylines for x in lPolyline]
+    lExtents = [max(x[i] for x in lAllPoints) - min(x[i] for x in lAllPoints) for i in range(3)]
+    fLargest = max(lExtents) or 1.0
+    if lExtents[2] <= fLargest * 1e-6:
+        return [[(x, y) for x, y, z in lPolyline] for lPolyline in lPolylines]
+    elif lExtents[1] <= fLargest * 1e-6:
+        return [[(x, -z) for x, y, z in lPolyline] for lPolyline in lPolylines]
+    elif lExtents[0] <= fLargest * 1e-6:
+        return [[(-z, y) for x, y, z in lPolyline] for lPolyline in lPolylines]
+    fYaw = math.radians(VIEWANGLES[0])
+    fPitch = math.radians(VIEWANGLES[1])
+    lResult = []
+    for lPolyline in lPolylines:
+        lProjected = []
+        for x, y, z in lPolyline:
+            fX = x * math.cos(fYaw) + z * math.sin(fYaw)
+            fZ = -x * math.sin(fYaw) + z * math.cos(fYaw)
+            lProjected.append((fX, y * math.cos(fPitch) - fZ * math.sin(fPitch)))
+        lResult.append(lProjected)
+    return lResult
+
+
+def _drawLine(baPixels, iWidth, tStart, tEnd):
+    """Draws a line between two pixels with Bresenham's algorithm."""
+    iX, iY = tStart
+    iEndX, iEndY = tEnd
+    iDeltaX = abs(iEndX - iX)
+    iDeltaY = -abs(iEndY - iY)
+    iStepX = 1 if iX < iEndX else -1
+    iStepY = 1 if iY < iEndY else -1
+    iError = iDeltaX + iDeltaY
+    while True:
+        iIndex = (iY * iWidth + iX) * 4
+        baPixels[iIndex:iIndex + 4] = bytearray(CURVECOLOR)
+        if iX == iEndX and iY == iEndY:
+            break
+        iError2 = 2 * iError
+        if iError2 >= iDeltaY:
+            iError += iDeltaY
+            iX += iStepX
+        if iError2 <= iDeltaX:
+            iError += iDeltaX
+            iY += iStepY
+
+
+def _encodePNG(baPixels, iWidth, iHeight):
+    """Encodes RGBA pixels into PNG file data.
+
+    Args:
+        baPixels (bytearray): RGBA pixels, row by row from the top
+        iWidth (int): width of the image
+        iHeight (int): height of the image
+    Returns:
+        bytes: the PNG file data
+    """
+    def chunk(bType, bData):
+        return (struct.pack('>I', len(bData)) + bType + bData +
+                struct.pack('>I', zlib.crc32(bType + bData) & 0xffffffff))
+
+    iRowLength = iWidth * 4
+    # Each row starts with filter type 0 (none)
+    baRaw = bytearray()
+    for iRow in range(iHeight):
+        baRaw.append(0)
+        baRaw.extend(baPixels[iRow * iRowLength:(iRow + 1) * iRowLength])
+    bHeader = struct.pack('>IIBBBBB', iWidth, iHeight, 8, 6, 0, 0, 0)
+    return (b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', bHeader) +
+            chunk(b'IDAT', zlib.compress(bytes(baRaw), 9)) + chunk(b'IEND', b''))
@@ -1,8 +1,43 @@
+import hashlib
+import itertools
+import json
+import os
+import re
+import shutil
+import numpy as np
+import maya.api.OpenMaya as om
 import maya.cmds as cmds
 import maya.mel as mel
 import pymel.core as pm
 from .. import common
 from .. import commonui
+from .. import geometry
+
+# Side codes used by the vectorized vertex classification
+SIDE_CENTER = 0
+SIDE_LEFT = 1
+SIDE_RIGHT = 2
+SIDENAMES = ('center', 'left', 'right')
+
+# Columns of the asymmetry report table: (key, header, format)
+REPORTCOLUMNS = (
+    ('name', 'Target', '{}'),
+    ('leftMagnitude', 'Left', '{:.4f}'),
+    ('rightMagnitude', 'Right', '{:.4f}'),
+    ('asymmetry', 'Asymmetry', '{:.3f}'),
+    ('maxDeviation', 'Max Dev', '{:.4f}'),
+    ('maxDeviationVertex', 'Vertex', '{}'),
+    ('asymmetricVertices', 'Asymmetric', '{}'),
+    ('changedVertices', 'Changed', '{}'),
+    ('centerDrift', 'Center Drift', '{:.4f}'),
+)
+
+# Directory of the on-disk base mesh cache. Can be overridden with the JYLIB_MESH_CACHE
+# environment variable.
+CACHEDIR = os.environ.get('JYLIB_MESH_CACHE') or os.path.join(
+    cmds.internalVar(userAppDir=True), 'jyLib', 'meshcache')
+# Size cap of the base mesh cache in bytes. The least recently used entries are evicted first.
+CACHESIZE = 512 * 1024 * 1024
 
 class BlendshapeMirrorHelper(object):
 
@@ -20,6 +55,12 @@ class BlendshapeMirrorHelper(object):
         self.btnRight = pm.button()
         self.btnRight.setLabel('Reset Right')
         self.btnRight.setCommand(pm.Callback(self._resetSideCallback, 'right'))
+        self.btnSplit = pm.button()
+        self.btnSplit.setLabel('Split Left/Right')
+        self.btnSplit.setCommand(pm.Callback(self._splitSidesCallback))
+        self.btnReport = pm.button()
+        self.btnReport.setLabel('Report Asymmetry')
+        self.btnReport.setCommand(pm.Callback(self._reportAsymmetryCallback))
 
         self.formMain.attachForm(self.blendshapeSelector.formMain, 'left', gToolOptionBoxTemplateFrameSpacing)
         self.formMain.attachForm(self.blendshapeSelector.formMain, 'top', gToolOptionBoxTemplateFrameSpacing)
@@ -37,6 +78,14 @@ class BlendshapeMirrorHelper(object):
         self.formMain.attachControl(self.btnRight, 'top', gToolOptionBoxTemplateFrameSpacing*3, self.baseSelector.formMain)
         self.formMain.attachPosition(self.btnRight, 'right', 0, 90)
         self.formMain.attachNone(self.btnRight, 'bottom')
+        self.formMain.attachPosition(self.btnSplit, 'left', 0, 10)
+        self.formMain.attachControl(self.btnSplit, 'top', gToolOptionBoxTemplateFrameSpacing, self.btnLeft)
+        self.formMain.attachPosition(self.btnSplit, 'right', 0, 45)
+        self.formMain.attachNone(self.btnSplit, 'bottom')
+        self.formMain.attachPosition(self.btnReport, 'left', 0, 55)
+        self.formMain.attachControl(self.btnReport, 'top', gToolOptionBoxTemplateFrameSpacing, self.btnRight)
+        self.formMain.attachPosition(self.btnReport, 'right', 0, 90)
+        self.formMain.attachNone(self.btnReport, 'bottom')
 
         cmds.setUITemplate(ppt=True)
 
@@ -51,13 +100,34 @@ class BlendshapeMirrorHelper(object):
 
         resetSide(self.blendshapeSelector.lItems, self.baseSelector.lItems[0], side)
 
+    def _splitSidesCallback(self):
+        # Input validation
+        if not self.blendshapeSelector.lItems:
+            cmds.error('Select blendshape(s) to split.')
+        if not self.baseSelector.lItems:
+            cmds.error('Select a base shape.')
+
+        splitSides(self.blendshapeSelector.lItems, self.baseSelector.lItems[0])
+
+    def _reportAsymmetryCallback(self):
+        # Input validation
+        if not self.blendshapeSelector.lItems:
+            cmds.error('Select blendshape(s) to analyze.')
+        if not self.baseSelector.lItems:
+            cmds.error('Select a base shape.')
+
+        lReport = analyzeAsymmetry(self.blendshapeSelector.lItems, self.baseSelector.lItems[0])
+        print(formatAsymmetryTable(lReport))
 
+
+@common.BulkOperation('Reset Side')
 def resetSide(lBlendshapeMeshes, xBaseMesh, side):
     """Moves blendshape verticies to their base positions on one side.
 
     The verticies on the provided side of the provided blendshape meshes will be reset to their positions
     on the provided base mesh. Verticies on the center will be moved half-way. When two matching blendshapes
     from both sides are set to 1, the center verticies will move to the correct positions.
+    Each blendshape is read and written in bulk.
 
     Left, Right, and Center are based the +Z direction being forward.
     
@@ -66,24 +136,69 @@ def resetSide(lBlendshapeMeshes, xBaseMesh, side):
         xBaseMesh (mesh): base mesh to compare to
         side (str): side to reset (left, right)
     """
-    # Get info about the base mesh
-    dictBaseSorted = _sortVerticies(xBaseMesh)
-    for xBlendshapeMesh in lBlendshapeMeshes:
+    uBaseMesh = common._getListOfObjectNames(xBaseMesh)[0]
+    aBasePoints, aSides = getBaseMeshData(uBaseMesh)
+    # Weight of the blendshape deltas that are kept on each vertex
+    if side == 'left':
+        aKeep = 1 - _getLeftWeights(aBasePoints, aSides)
+    else:
+        aKeep = _getLeftWeights(aBasePoints, aSides)
+    for uBlendshapeMesh in common._getListOfObjectNames(lBlendshapeMeshes):
         # Perform this action on each blendshape
-        if len(xBlendshapeMesh.vtx) != len(xBaseMesh.vtx):
-            # Warning about potential non-matching blendshape and base meshes
-            cmds.warning("{} and {} have different vertex counts.".format(xBlendshapeMesh.name(), xBaseMesh.name()))
-        for i, iSide in dictBaseSorted.iteritems():
-            # Iterate through each vertex index
-            # Position of the base vertex
-            lBaseVtxPos = cmds.pointPosition('{}.vtx[{}]'.format(xBaseMesh.name(), i))
-            # Position of the blendshape vertex
-            lBlendshapeVtxPos = cmds.pointPosition('{}.vtx[{}]'.format(xBlendshapeMesh.name(), i))
-            if lBaseVtxPos != lBlendshapeVtxPos:
-                if iSide == side:
-                    cmds.xform('{}.vtx[{}]'.format(xBlendshapeMesh.name(), i), ws=True, t=lBaseVtxPos)
-                elif iSide == 'center':
-                    cmds.xform('{}.vtx[{}]'.format(xBlendshapeMesh.name(), i), ws=True, t=common.midpoint(lBaseVtxPos, lBlendshapeVtxPos))
+        aPoints = _getPoints(uBlendshapeMesh)
+        if len(aPoints) != len(aBasePoints):
+            # Warning about non-matching blendshape and base meshes
+            cmds.warning("{} and {} have different vertex counts. Skipping {}.".format(
+                uBlendshapeMesh, uBaseMesh, uBlendshapeMesh))
+            continue
+        _setPoints(uBlendshapeMesh, aBasePoints + (aPoints - aBasePoints) * aKeep[:, np.newaxis],
+                   aPoints)
+
+
+@common.BulkOperation('Split Sides')
+def splitSides(lBlendshapeMeshes, xBaseMesh, fFalloff=0.0, uLeftName='{}_L', uRightName='{}_R'):
+    """Splits symmetric blendshapes into a left and a right blendshape.
+
+    The base mesh and each blendshape are read once and both halves are computed in a single
+    pass. Each blendshape is duplicated twice and the new positions are written to the
+    duplicates in bulk. Only one blendshape is held in memory at a time.
+
+    Without a falloff, the verticies on the center are moved half-way in both halves, the same
+    as resetSide. With a falloff, the deltas blend smoothly from one side to the other within
+    fFalloff of the center. Either way, both halves added together match the original
+    blendshape.
+
+    Left, Right, and Center are based the +Z direction being forward.
+
+    Args:
+        lBlendshapeMeshes (list of meshes): symmetric blendshapes to split
+        xBaseMesh (mesh): base mesh to compare to
+        fFalloff (float, optional): distance from the center over which the sides blend
+        uLeftName (str, optional): name of the left blendshapes, formatted with the name of
+            the blendshape
+        uRightName (str, optional): name of the right blendshapes, formatted with the name of
+            the blendshape
+    Returns:
+        list: list of (left blendshape, right blendshape) names
+    """
+    uBaseMesh = common._getListOfObjectNames(xBaseMesh)[0]
+    aBasePoints, aSides = getBaseMeshData(uBaseMesh)
+    aLeft = _getLeftWeights(aBasePoints, aSides, fFalloff)[:, np.newaxis]
+    lResult = []
+    for uBlendshapeMesh in common._getListOfObjectNames(lBlendshapeMeshes):
+        aPoints = _getPoints(uBlendshapeMesh)
+        if len(aPoints) != len(aBasePoints):
+            cmds.warning("{} and {} have different vertex counts. Skipping {}.".format(
+                uBlendshapeMesh, uBaseMesh, uBlendshapeMesh))
+            continue
+        aDeltas = aPoints - aBasePoints
+        uName = common.getObjectName(uBlendshapeMesh.rsplit('|', 1)[-1])
+        uLeft = cmds.duplicate(uBlendshapeMesh, n=uLeftName.format(uName))[0]
+        _setPoints(uLeft, aBasePoints + aDeltas * aLeft, aPoints)
+        uRight = cmds.duplicate(uBlendshapeMesh, n=uRightName.format(uName))[0]
+        _setPoints(uRight, aBasePoints + aDeltas * (1 - aLeft), aPoints)
+        lResult.append((uLeft, uRight))
+    return lResult
 
 
 def _sortVerticies(xMesh):
@@ -94,18 +209,397 @@ def _sortVerticies(xMesh):
     Args:
         xMesh (mesh): the mesh to sort
     """
-    dictResult = {}
-    uMesh = xMesh.longName()
-    for i in xrange(len(xMesh.vtx)):
-        lPos = cmds.pointPosition('{}.vtx[{}]'.format(uMesh, i), world=True)
-        if common.isclose(0, lPos[0], abs_tol=0.000001):
-            dictResult[i] = 'center'
-        elif lPos[0] > 0:
-            dictResult[i] = 'left'
-        else:
-            dictResult[i] = 'right'
-    return dictResult
+    aSides = getBaseMeshData(xMesh)[1]
+    return dict((i, SIDENAMES[iSide]) for i, iSide in enumerate(aSides))
+
+
+def _getPoints(uMesh):
+    """Returns the world space positions of all the verticies of the mesh in a single query.
+
+    Args:
+        uMesh (str): name of the mesh
+    Returns:
+        ndarray: (N, 3) array of vertex positions
+    """
+    return np.array(cmds.xform('{}.vtx[*]'.format(uMesh), q=True, ws=True, t=True),
+                    dtype=float).reshape(-1, 3)
+
+
+def _setPoints(uMesh, aPoints, aCurrentPoints=None):
+    """Sets the world space positions of all the verticies of the mesh in bulk.
+
+    The change in position is converted to object space and added to the tweaks of the mesh
+    shape with a single setAttr, so the edit is undoable.
+
+    Args:
+        uMesh (str): name of the mesh
+        aPoints (ndarray): (N, 3) array of new vertex positions
+        aCurrentPoints (ndarray, optional): (N, 3) array of the current vertex positions, if
+            they were already read
+    """
+    if aCurrentPoints is None:
+        aCurrentPoints = _getPoints(uMesh)
+    lShapes = cmds.listRelatives(uMesh, s=True, ni=True, f=True, type='mesh')
+    if lShapes:
+        uShape = lShapes[0]
+    else:
+        # The mesh shape was provided instead of the transform
+        uShape = uMesh
+        uMesh = cmds.listRelatives(uShape, p=True, f=True)[0]
+    aMatrix = np.array(cmds.xform(uMesh, q=True, ws=True, m=True), dtype=float).reshape(4, 4)
+    aDeltas = (np.asarray(aPoints) - aCurrentPoints).dot(np.linalg.inv(aMatrix[:3, :3]))
+    uTweaks = '{}.pnts[0:{}]'.format(uShape, len(aDeltas) - 1)
+    aTweaks = np.array(cmds.getAttr(uTweaks), dtype=float).reshape(-1, 3)
+    cmds.setAttr(uTweaks, *(aTweaks + aDeltas).ravel().tolist())
+
+
+def _getLeftWeights(aPoints, aSides, fFalloff=0.0):
+    """Returns how much of a symmetric blendshape belongs to the left side at each point.
+
+    Args:
+        aPoints (ndarray): (N, 3) array of points
+        aSides (ndarray): (N,) array of side codes of the points
+        fFalloff (float, optional): distance from the center over which the weights blend
+            from 0 to 1. Without a falloff, center points are weighted 0.5
+    Returns:
+        ndarray: (N,) array of weights from 0 (right) to 1 (left)
+    """
+    if fFalloff > 0:
+        aT = np.clip((np.asarray(aPoints)[:, 0] / fFalloff + 1) * 0.5, 0.0, 1.0)
+        return aT * aT * (3 - 2 * aT)
+    aWeights = np.full(len(aSides), 0.5)
+    aWeights[aSides == SIDE_LEFT] = 1.0
+    aWeights[aSides == SIDE_RIGHT] = 0.0
+    return aWeights
+
+
+def _classifySides(aPoints, fTolerance=0.000001):
+    """Returns the side code (SIDE_CENTER, SIDE_LEFT, SIDE_RIGHT) of each point.
+
+    Left, Right, and Center are based the +Z direction being forward.
+
+    Args:
+        aPoints (ndarray): (N, 3) array of points
+        fTolerance (float, optional): distance from the YZ plane that is considered center
+    Returns:
+        ndarray: (N,) array of side codes
+    """
+    aSides = np.where(aPoints[:, 0] > 0, SIDE_LEFT, SIDE_RIGHT)
+    aSides[geometry.isclose(0, aPoints[:, 0], abs_tol=fTolerance)] = SIDE_CENTER
+    return aSides
+
+
+def _getMeshFingerprint(uMesh, aPoints):
+    """Returns the cache key of the mesh from its vertex positions.
+
+    The key contains the mesh name and vertex count followed by a hash of the face topology
+    and of the vertex positions, so any edit to the mesh changes the key. The positions are
+    the ones already read by the caller, only the topology is read here through MFnMesh.
+
+    Args:
+        uMesh (str): name of the mesh
+        aPoints (ndarray): (N, 3) array of the vertex positions of the mesh
+    Returns:
+        str: the cache key
+    """
+    lShapes = cmds.listRelatives(uMesh, s=True, ni=True, f=True, type='mesh') or [uMesh]
+    selMesh = om.MSelectionList()
+    selMesh.add(lShapes[0])
+    lCounts, lConnects = om.MFnMesh(selMesh.getDagPath(0)).getVertices()
+    hashMesh = hashlib.sha1()
+    hashMesh.update(np.array(lCounts, dtype=np.int32).tobytes())
+    hashMesh.update(np.array(lConnects, dtype=np.int32).tobytes())
+    hashMesh.update(np.ascontiguousarray(aPoints, dtype=np.float64).tobytes())
+    uName = re.sub(r'[^\w]', '_', uMesh.strip('|'))
+    return '{}_{}_{}'.format(uName, len(aPoints), hashMesh.hexdigest()[:16])
+
+
+def _loadBaseCache(uKey, uName):
+    """Loads a cached array of a base mesh as a memory-mapped array.
+
+    Args:
+        uKey (str): cache key of the mesh
+        uName (str): name of the array
+    Returns:
+        ndarray: the array, or None if it is not cached
+    """
+    uDir = os.path.join(CACHEDIR, uKey)
+    uPath = os.path.join(uDir, uName + '.npy')
+    if not os.path.isfile(uPath):
+        return None
+    # Mark the entry as recently used
+    os.utime(uDir, None)
+    return np.load(uPath, mmap_mode='r')
+
+
+def _saveBaseCache(uKey, dictArrays):
+    """Adds arrays to the cache entry of a base mesh and evicts old entries.
+
+    Args:
+        uKey (str): cache key of the mesh
+        dictArrays (dict): array name to array
+    """
+    uDir = os.path.join(CACHEDIR, uKey)
+    if not os.path.isdir(uDir):
+        os.makedirs(uDir)
+    for uName, aArray in dictArrays.iteritems():
+        # Write to a temporary file first so that a partially written array is never loaded
+        uPath = os.path.join(uDir, uName + '.npy')
+        with open(uPath + '.tmp', 'wb') as fileArray:
+            np.save(fileArray, np.ascontiguousarray(aArray))
+        if os.path.exists(uPath):
+            os.remove(uPath)
+        os.rename(uPath + '.tmp', uPath)
+    _evictBaseCache()
+
+
+def _evictBaseCache():
+    """Removes the least recently used cache entries until the cache is under CACHESIZE."""
+    if not os.path.isdir(CACHEDIR):
+        return
+    lEntries = []
+    iTotal = 0
+    for uKey in os.listdir(CACHEDIR):
+        uDir = os.path.join(CACHEDIR, uKey)
+        if not os.path.isdir(uDir):
+            continue
+        iSize = sum(os.path.getsize(os.path.join(uDir, x)) for x in os.listdir(uDir))
+        lEntries.append((os.path.getmtime(uDir), iSize, uDir))
+        iTotal += iSize
+    for _, iSize, uDir in sorted(lEntries):
+        if iTotal <= CACHESIZE:
+            break
+        shutil.rmtree(uDir, ignore_errors=True)
+        iTotal -= iSize
+
+
+def clearBaseCache():
+    """Removes every entry of the on-disk base mesh cache."""
+    if os.path.isdir(CACHEDIR):
+        shutil.rmtree(CACHEDIR, ignore_errors=True)
+
+
+def _readBaseMesh(uBaseMesh, bUseCache=True):
+    """Reads the vertex positions of the base mesh once and gets its cache key from them.
+
+    Args:
+        uBaseMesh (str): name of the base mesh
+        bUseCache (bool, optional): whether the on-disk cache is used
+    Returns:
+        ndarray, str: (N, 3) array of vertex positions, cache key or None without the cache
+    """
+    aPoints = _getPoints(uBaseMesh)
+    uKey = _getMeshFingerprint(uBaseMesh, aPoints) if bUseCache else None
+    return aPoints, uKey
+
+
+def _getCachedArray(uKey, uName, funcCompute, *args):
+    """Returns an array derived from the base mesh, computing and caching it if needed.
+
+    Args:
+        uKey (str): cache key of the base mesh, or None to skip the cache
+        uName (str): name of the array in the cache entry
+        funcCompute (function): function that computes the array
+        *args: arguments of funcCompute
+    Returns:
+        ndarray: the array
+    """
+    if uKey is not None:
+        aArray = _loadBaseCache(uKey, uName)
+        if aArray is not None:
+            return aArray
+    aArray = funcCompute(*args)
+    if uKey is not None:
+        _saveBaseCache(uKey, {uName: aArray})
+    return aArray
+
+
+def getBaseMeshData(xBaseMesh, bUseCache=True):
+    """Returns the vertex positions and side codes of the base mesh.
+
+    The base mesh is read once. The side codes are stored in an on-disk cache keyed by a hash
+    of the mesh's topology and points, so a cache hit skips the side classification. Cached
+    arrays are memory-mapped and read-only.
+
+    Args:
+        xBaseMesh (mesh): base mesh
+        bUseCache (bool, optional): whether the on-disk cache is used
+    Returns:
+        ndarray, ndarray: (N, 3) array of vertex positions, (N,) array of side codes
+    """
+    uBaseMesh = common._getListOfObjectNames(xBaseMesh)[0]
+    aPoints, uKey = _readBaseMesh(uBaseMesh, bUseCache)
+    return aPoints, _getCachedArray(uKey, 'sides', _classifySides, aPoints)
 
 
+def getSymmetryMap(xBaseMesh, fTolerance=0.0001, bUseCache=True):
+    """Returns the index of the mirrored vertex across the YZ plane for each vertex.
 
+    Each vertex is matched with the closest vertex to its mirrored position within the
+    tolerance. The map is stored in the on-disk cache along with the side codes.
 
+    Args:
+        xBaseMesh (mesh): base mesh
+        fTolerance (float, optional): largest distance between a mirrored position and its
+            match
+        bUseCache (bool, optional): whether the on-disk cache is used
+    Returns:
+        ndarray: (N,) array of vertex indicies, -1 where no mirrored vertex was found
+    """
+    uBaseMesh = common._getListOfObjectNames(xBaseMesh)[0]
+    aPoints, uKey = _readBaseMesh(uBaseMesh, bUseCache)
+    return _getCachedArray(uKey, 'symmetryMap_{:g}'.format(fTolerance), _computeSymmetryMap,
+                           aPoints, fTolerance)
+
+
+def _computeSymmetryMap(aPoints, fTolerance):
+    """Matches each point with the closest point to its mirrored position across the YZ plane.
+
+    Points are sorted into a grid with cells the size of the tolerance. Each mirrored position
+    is compared with the points in its own cell and the surrounding cells, so pairs that fall
+    on either side of a cell boundary are still matched.
+
+    Args:
+        aPoints (ndarray): (N, 3) array of points
+        fTolerance (float): largest distance between a mirrored position and its match
+    Returns:
+        ndarray: (N,) array of point indicies, -1 where no mirrored point was found
+    """
+    aPoints = np.asarray(aPoints, dtype=float)
+    aMirrored = aPoints * np.array([-1.0, 1.0, 1.0])
+    aCells = np.floor(aPoints / fTolerance).astype(np.int64)
+    aMirroredCells = np.floor(aMirrored / fTolerance).astype(np.int64)
+    # View each row as a single value so that rows can be sorted and searched
+    dtypeRow = np.dtype((np.void, aCells.dtype.itemsize * 3))
+    aKeys = np.ascontiguousarray(aCells).view(dtypeRow).ravel()
+    aOrder = np.argsort(aKeys)
+    aSortedKeys = aKeys[aOrder]
+    # Largest number of points in a cell, so that every point of a crowded cell is checked
+    aStarts = np.flatnonzero(np.append(True, aSortedKeys[1:] != aSortedKeys[:-1]))
+    iMaxCount = int(np.diff(np.append(aStarts, len(aSortedKeys))).max()) if len(aKeys) else 0
+
+    aResult = np.full(len(aPoints), -1, dtype=np.int64)
+    aBestDistances = np.full(len(aPoints), np.inf)
+    for tOffset in itertools.product((-1, 0, 1), repeat=3):
+        aSearchKeys = np.ascontiguousarray(aMirroredCells + tOffset).view(dtypeRow).ravel()
+        aFound = np.searchsorted(aSortedKeys, aSearchKeys)
+        for i in xrange(iMaxCount):
+            aIndicies = (aFound + i).clip(0, len(aKeys) - 1)
+            aCandidates = aOrder[aIndicies]
+            aDistances = np.linalg.norm(aPoints[aCandidates] - aMirrored, axis=1)
+            aBetter = ((aSortedKeys[aIndicies] == aSearchKeys) & (aDistances <= fTolerance) &
+                       (aDistances < aBestDistances))
+            aResult[aBetter] = aCandidates[aBetter]
+            aBestDistances[aBetter] = aDistances[aBetter]
+    return aResult
+
+
+def analyzeAsymmetry(lBlendshapeMeshes, xBaseMesh, fTolerance=0.00001, fMatchTolerance=0.0001):
+    """Measures how asymmetric each blendshape is compared to the base mesh.
+
+    Nothing in the scene is modified. Each blendshape is read in a single query and the delta
+    of each vertex from the base mesh is compared with the mirrored delta of its symmetric
+    vertex from getSymmetryMap. Blendshapes with a different vertex count than the base mesh
+    are skipped with a warning.
+
+    The report contains one dictionary per blendshape with the following keys:
+        name: name of the blendshape
+        leftMagnitude, rightMagnitude: summed length of the deltas on each side
+        asymmetry: summed deviation from the mirrored deltas relative to the summed length of
+            the deltas and the mirrored deltas (0 is symmetric, 1 is fully asymmetric)
+        maxDeviation: largest deviation of a delta from the mirrored delta
+        maxDeviationVertex: index of the vertex with the largest deviation, -1 if none
+        asymmetricVertices: number of verticies that deviate more than the tolerance
+        changedVertices: number of verticies that moved more than the tolerance
+        centerDrift: largest movement of a center vertex off the center line
+        unmatchedVertices: number of verticies without a symmetric vertex on the base mesh,
+            which are left out of the deviations
+
+    Args:
+        lBlendshapeMeshes (list of meshes): blendshapes to analyze
+        xBaseMesh (mesh): base mesh to compare to
+        fTolerance (float, optional): minimum delta length and deviation that counts
+        fMatchTolerance (float, optional): largest distance between the mirrored position of
+            a vertex and its symmetric vertex
+    Returns:
+        list: list of dictionaries, one per blendshape
+    """
+    uBaseMesh = common._getListOfObjectNames(xBaseMesh)[0]
+    # Read the base mesh once for both cached arrays
+    aBasePoints, uKey = _readBaseMesh(uBaseMesh)
+    aSides = _getCachedArray(uKey, 'sides', _classifySides, aBasePoints)
+    aSymmetry = _getCachedArray(uKey, 'symmetryMap_{:g}'.format(fMatchTolerance),
+                                _computeSymmetryMap, aBasePoints, fMatchTolerance)
+    aMatched = aSymmetry >= 0
+    aMirrorIndicies = np.where(aMatched, aSymmetry, np.arange(len(aSymmetry)))
+    aLeft = aSides == SIDE_LEFT
+    aRight = aSides == SIDE_RIGHT
+    aCenter = aSides == SIDE_CENTER
+    aMirror = np.array([-1.0, 1.0, 1.0])
+
+    lReport = []
+    for uBlendshapeMesh in common._getListOfObjectNames(lBlendshapeMeshes):
+        aPoints = _getPoints(uBlendshapeMesh)
+        if len(aPoints) != len(aBasePoints):
+            cmds.warning("{} and {} have different vertex counts. Skipping {}.".format(
+                uBlendshapeMesh, uBaseMesh, uBlendshapeMesh))
+            continue
+        aDeltas = aPoints - aBasePoints
+        aLengths = np.sqrt(np.einsum('ij,ij->i', aDeltas, aDeltas))
+        aLengths[aLengths <= fTolerance] = 0.0
+        # A symmetric blendshape moves each vertex by the mirrored delta of its symmetric vertex
+        aDifferences = aDeltas - aDeltas[aMirrorIndicies] * aMirror
+        aDeviations = np.sqrt(np.einsum('ij,ij->i', aDifferences, aDifferences))
+        aDeviations[~aMatched | (aDeviations <= fTolerance)] = 0.0
+        fTotal = float((aLengths + aLengths[aMirrorIndicies])[aMatched].sum())
+        iMaxVertex = int(aDeviations.argmax()) if len(aDeviations) else -1
+        fMaxDeviation = float(aDeviations[iMaxVertex]) if iMaxVertex >= 0 else 0.0
+        lReport.append({
+            'name': uBlendshapeMesh,
+            'leftMagnitude': float(aLengths[aLeft].sum()),
+            'rightMagnitude': float(aLengths[aRight].sum()),
+            'asymmetry': float(aDeviations.sum()) / fTotal if fTotal else 0.0,
+            'maxDeviation': fMaxDeviation,
+            'maxDeviationVertex': iMaxVertex if fMaxDeviation else -1,
+            'asymmetricVertices': int(np.count_nonzero(aDeviations)),
+            'changedVertices': int(np.count_nonzero(aLengths)),
+            'centerDrift': float(np.abs(aPoints[aCenter, 0]).max()) if aCenter.any() else 0.0,
+            'unmatchedVertices': int(np.count_nonzero(~aMatched)),
+        })
+    return lReport
+
+
+def formatAsymmetryTable(lReport, uSortKey='asymmetry', bDescending=True):
+    """Formats an asymmetry report as a text table.
+
+    Args:
+        lReport (list): report returned by analyzeAsymmetry
+        uSortKey (str, optional): report key to sort the rows by
+        bDescending (bool, optional): whether the rows are sorted from largest to smallest
+    Returns:
+        str: the table
+    """
+    lRows = [[uHeader for _, uHeader, _ in REPORTCOLUMNS]]
+    for dictTarget in sorted(lReport, key=lambda x: x[uSortKey], reverse=bDescending):
+        lRows.append([uFormat.format(dictTarget[uKey]) for uKey, _, uFormat in REPORTCOLUMNS])
+    lWidths = [max(len(lRow[i]) for lRow in lRows) for i in xrange(len(REPORTCOLUMNS))]
+    lLines = []
+    for lRow in lRows:
+        lCells = [uCell.ljust(iWidth) for uCell, iWidth in zip(lRow, lWidths)]
+        lLines.append('  '.join(lCells).rstrip())
+    lLines.insert(1, '-' * len(lLines[0]))
+    return '\n'.join(lLines)
+
+
+def writeAsymmetryReport(lReport, uPath, uSortKey='asymmetry', bDescending=True):
+    """Writes an asymmetry report to a JSON file.
+
+    Args:
+        lReport (list): report returned by analyzeAsymmetry
+        uPath (str): path of the JSON file
+        uSortKey (str, optional): report key to sort the targets by
+        bDescending (bool, optional): whether the targets are sorted from largest to smallest
+    """
+    lSorted = sorted(lReport, key=lambda x: x[uSortKey], reverse=bDescending)
+    with open(uPath, 'w') as fileReport:
+        json.dump(lSorted, fileReport, indent=4, sort_keys=True)
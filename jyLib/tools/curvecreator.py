@@ -1,30 +1,98 @@
+import os
 import maya.cmds as cmds
 import maya.mel as mel
 import pymel.core as pm
 from .. import common
 from .. import curves
+from .. import thumbnails
+
+# Directory of the cached curve thumbnails
+THUMBNAILDIR = os.path.join(cmds.internalVar(userAppDir=True), 'jyLib', 'thumbnails')
+# Width and height of the curve thumbnails in pixels
+THUMBNAILSIZE = 64
 
 
 class CurveCreator(object):
 
-    def __init__(self):
+    def __init__(self, iPageSize=24, iColumns=4):
         gToolOptionBoxTemplateFrameSpacing = common.getVariable('gToolOptionBoxTemplateFrameSpacing')
 
         cmds.setUITemplate('ToolOptionBoxTemplate', pst=True)
 
-        self.formMain = pm.formLayout()
+        self.iPageSize = iPageSize
+        self.iPage = 0
 
-        column = pm.columnLayout(cat=('both', 5), rs=5, bgc=(1, 0, 0))
-        for uType, dictInfo in curves.CURVEINFO.iteritems():
-            btn = pm.button()
-            btn.setLabel(uType)
-            btn.setCommand(pm.Callback(curves.create, uType))
+        self.formMain = pm.formLayout()
+        self.txtfFilter = pm.textField(tcc=pm.Callback(self._filterCallback))
+        self.btnPrevious = pm.button()
+        self.btnPrevious.setLabel('<')
+        self.btnPrevious.setWidth(30)
+        self.btnPrevious.setCommand(pm.Callback(self._pageCallback, -1))
+        self.txtPage = pm.text()
+        self.btnNext = pm.button()
+        self.btnNext.setLabel('>')
+        self.btnNext.setWidth(30)
+        self.btnNext.setCommand(pm.Callback(self._pageCallback, 1))
+        self.gridShapes = pm.gridLayout(nc=iColumns, cwh=(THUMBNAILSIZE + 16, THUMBNAILSIZE + 20))
+        pm.setParent('..')
 
-        self.formMain.attachForm(column, 'left', gToolOptionBoxTemplateFrameSpacing)
-        self.formMain.attachForm(column, 'top', gToolOptionBoxTemplateFrameSpacing)
-        self.formMain.attachForm(column, 'right', gToolOptionBoxTemplateFrameSpacing)
-        self.formMain.attachForm(column, 'bottom', gToolOptionBoxTemplateFrameSpacing)
+        self.formMain.attachForm(self.txtfFilter, 'left', gToolOptionBoxTemplateFrameSpacing)
+        self.formMain.attachForm(self.txtfFilter, 'top', gToolOptionBoxTemplateFrameSpacing)
+        self.formMain.attachControl(self.txtfFilter, 'right', gToolOptionBoxTemplateFrameSpacing, self.btnPrevious)
+        self.formMain.attachNone(self.txtfFilter, 'bottom')
+        self.formMain.attachNone(self.btnPrevious, 'left')
+        self.formMain.attachForm(self.btnPrevious, 'top', gToolOptionBoxTemplateFrameSpacing)
+        self.formMain.attachControl(self.btnPrevious, 'right', gToolOptionBoxTemplateFrameSpacing, self.txtPage)
+        self.formMain.attachNone(self.btnPrevious, 'bottom')
+        self.formMain.attachNone(self.txtPage, 'left')
+        self.formMain.attachForm(self.txtPage, 'top', gToolOptionBoxTemplateFrameSpacing)
+        self.formMain.attachControl(self.txtPage, 'right', gToolOptionBoxTemplateFrameSpacing, self.btnNext)
+        self.formMain.attachNone(self.txtPage, 'bottom')
+        self.formMain.attachNone(self.btnNext, 'left')
+        self.formMain.attachForm(self.btnNext, 'top', gToolOptionBoxTemplateFrameSpacing)
+        self.formMain.attachForm(self.btnNext, 'right', gToolOptionBoxTemplateFrameSpacing)
+        self.formMain.attachNone(self.btnNext, 'bottom')
+        self.formMain.attachForm(self.gridShapes, 'left', gToolOptionBoxTemplateFrameSpacing)
+        self.formMain.attachControl(self.gridShapes, 'top', gToolOptionBoxTemplateFrameSpacing, self.txtfFilter)
+        self.formMain.attachForm(self.gridShapes, 'right', gToolOptionBoxTemplateFrameSpacing)
+        self.formMain.attachForm(self.gridShapes, 'bottom', gToolOptionBoxTemplateFrameSpacing)
 
         cmds.setUITemplate(ppt=True)
 
-    
\ No newline at end of file
+        self._refresh()
+
+    def _getTypes(self):
+        """Returns the sorted curve types whose names contain the filter text."""
+        uFilter = self.txtfFilter.getText().lower()
+        return sorted(x for x in curves.CURVEINFO if uFilter in x.lower())
+
+    def _filterCallback(self):
+        self.iPage = 0
+        self._refresh()
+
+    def _pageCallback(self, iStep):
+        self.iPage += iStep
+        self._refresh()
+
+    def _refresh(self):
+        """Rebuilds the buttons of the current page.
+
+        Only the curve types on the current page get buttons. Thumbnails are rendered the
+        first time a shape is shown and are read from THUMBNAILDIR afterwards.
+        """
+        lTypes = self._getTypes()
+        iPageCount = max(1, (len(lTypes) + self.iPageSize - 1) // self.iPageSize)
+        self.iPage = min(max(self.iPage, 0), iPageCount - 1)
+        self.txtPage.setLabel('{}/{}'.format(self.iPage + 1, iPageCount))
+        self.btnPrevious.setEnable(self.iPage > 0)
+        self.btnNext.setEnable(self.iPage < iPageCount - 1)
+
+        lChildren = self.gridShapes.getChildArray()
+        if lChildren:
+            pm.deleteUI(lChildren)
+        iStart = self.iPage * self.iPageSize
+        for uType in lTypes[iStart:iStart + self.iPageSize]:
+            uThumbnail = thumbnails.getThumbnail(curves.CURVEINFO[uType], THUMBNAILDIR,
+                                                 THUMBNAILSIZE)
+            pm.iconTextButton(p=self.gridShapes, st='iconAndTextVertical', i=uThumbnail, l=uType,
+                              c=pm.Callback(curves.create, uType))